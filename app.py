@@ -2,41 +2,60 @@
 Auditor - Powered by OpenGradient SDK 0.9.3
 Uses direct IP (3.15.214.21) natively bypassing SSL checks.
 """
-import os, json, threading, time, hashlib, re
+import os, json, threading, time, hashlib, queue
 import asyncio
-try:
-    import nest_asyncio
-    nest_asyncio.apply()
-except ImportError:
-    pass
-
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except ImportError:
-    pass
-
-try:
-    from flask import Flask, request, jsonify, send_from_directory
-    from flask_cors import CORS
-except Exception as e:
-    print(f"[BOOT] Flask import failed: {e}")
-
-try:
-    import opengradient as og
-    print(f"[BOOT] opengradient version: {getattr(og, '__version__', 'unknown')}")
-except Exception as e:
-    print(f"[BOOT] opengradient import failed: {e}")
-
-try:
-    from web3 import Web3
-except Exception as e:
-    print(f"[BOOT] web3 import failed: {e}")
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import startup
+
+with startup.timed("import", "dotenv"):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+with startup.timed("import", "flask"):
+    try:
+        from flask import Flask, Response, request, jsonify, send_from_directory
+        from flask_cors import CORS
+    except Exception as e:
+        print(f"[BOOT] Flask import failed: {e}")
+
+# Heavy SDKs load on first use (or in the warm-up thread), not at import time.
+# OG_MOCK=1 swaps in the local stand-in (mock_og.py) for offline load tests.
+OG_MOCK = os.environ.get("OG_MOCK", "0") == "1"
+og = startup.LazyModule("mock_og" if OG_MOCK else "opengradient")
+
+with startup.timed("import", "auditor"):
+    from audit_cache import AuditCache, cache_key, CACHE_ENABLED
+    from dispatcher import InferenceDispatcher, QueueTimeout
+    from llm_pool import LLMPool
+    import event_loop
+    from jobs import JobManager, QueueFull
+    from rpc import RpcPool, balance_of_call, decimals_call, decode_uint
+    from chunking import plan_chunks, merge_reports, strip_markers, estimate_tokens, CHUNK_AUTO_TOKENS, CHUNK_WORKERS
+    from reports import items
+    from static_analysis import analyze, facts_prompt, merge_findings, local_report
+    from compaction import compact, remap_line_hints, invert_line_map, COMPACT_ENABLED
+    import incremental
+    import batch
+    from history import HistoryStore
+    from singleflight import SingleFlight
+    import llm_json
+    import metrics
+    import review_policy
+    from hedging import Hedger, HEDGE_ENABLED, HEDGE_BACKUP
+    from router import Router, classify as classify_error
+    from retry_policy import Budget, RetryStats, kind_of, repair_messages, NON_RETRYABLE, PARSE, RETRYABLE, RETRY_BUDGET
 
 app = Flask(__name__, static_folder="static")
 CORS(app)
 
 PRIVATE_KEY = os.environ.get("OG_PRIVATE_KEY") or ""
+if OG_MOCK and not PRIVATE_KEY:
+    # Well-known local development key (Hardhat account #0); the mock never settles payments
+    PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
 if PRIVATE_KEY:
     PRIVATE_KEY = PRIVATE_KEY.strip()
     if not PRIVATE_KEY.startswith("0x") and len(PRIVATE_KEY) == 64:
@@ -44,33 +63,63 @@ if PRIVATE_KEY:
 
 # OpenGradient 0.9.4 handles gateway discovery automatically.
 
-w3b = Web3(Web3.HTTPProvider("https://sepolia.base.org"))
-
-def safe_wallet():
+@startup.once
+def get_wallet():
+    """Derive the wallet address from PRIVATE_KEY (imports eth_account on first call)."""
     try:
-        acct = w3b.eth.account.from_key(PRIVATE_KEY)
-        return acct.address
+        with startup.timed("import", "eth_account"):
+            from eth_account import Account
+        return Account.from_key(PRIVATE_KEY).address
     except:
         return "0x00...00"
 
-WALLET = safe_wallet()
+OPG_TOKEN = "0x240b09731D96979f50B2C649C9CE10FcF9C7987F"
+rpc_pool = RpcPool()
+
+BALANCE_TTL = float(os.environ.get("BALANCE_TTL", 30))
+_token_decimals = None
+_balance = {"value": None, "fetched": None, "refreshing": False, "error": None}
+_balance_lock = threading.Lock()
 
-OPG_TOKEN = Web3.to_checksum_address("0x240b09731D96979f50B2C649C9CE10FcF9C7987F")
-ERC20_ABI = [
-    {"inputs":[{"name":"account","type":"address"}],"name":"balanceOf",
-     "outputs":[{"name":"","type":"uint256"}],"stateMutability":"view","type":"function"},
-    {"inputs":[],"name":"decimals",
-     "outputs":[{"name":"","type":"uint8"}],"stateMutability":"view","type":"function"},
-]
-token = w3b.eth.contract(address=OPG_TOKEN, abi=ERC20_ABI)
+def _balance_calls():
+    # decimals() never changes for a deployed token, so it only rides along on the first batch
+    calls = [balance_of_call(OPG_TOKEN, get_wallet())]
+    if _token_decimals is None:
+        calls.append(decimals_call(OPG_TOKEN))
+    return calls
 
-def get_opg_balance():
+def _to_balance(results):
+    global _token_decimals
+    if len(results) > 1:
+        _token_decimals = decode_uint(results[1])
+    return round(decode_uint(results[0]) / 10**_token_decimals, 4)
+
+async def _refresh_balance():
     try:
-        raw = token.functions.balanceOf(WALLET).call()
-        dec = token.functions.decimals().call()
-        return round(raw / 10**dec, 4)
-    except:
-        return 0.0
+        value, error = _to_balance(await rpc_pool.abatch(_balance_calls())), None
+    except Exception as e:
+        value, error = None, str(e)
+    with _balance_lock:
+        if value is not None:
+            _balance["value"] = value
+            _balance["fetched"] = time.time()
+        elif _balance["value"] is None:
+            _balance["value"] = 0.0
+        _balance["error"] = error
+        _balance["refreshing"] = False
+
+def cached_balance():
+    """Serve the balance from memory; refresh it in the background once older than BALANCE_TTL.
+    Returns (balance, age_ms) where age_ms is None until the first fetch completes."""
+    now = time.time()
+    with _balance_lock:
+        fetched = _balance["fetched"]
+        stale = fetched is None or now - fetched > BALANCE_TTL
+        if stale and not _balance["refreshing"]:
+            _balance["refreshing"] = True
+            event_loop.submit(_refresh_balance())
+        age_ms = int((now - fetched) * 1000) if fetched else None
+        return _balance["value"], age_ms
 
 def _m(name, fallback=None):
     """Safely get a TEE_LLM enum member by name."""
@@ -84,30 +133,41 @@ def _m(name, fallback=None):
             return fallback_val
     return getattr(og.TEE_LLM, "GEMINI_2_5_FLASH", None)
 
-MODELS = {
+MODEL_SPECS = {
     # Legacy keys
-    "GEMINI_2_0_FLASH":      _m("GEMINI_2_5_FLASH"),
-    "GEMINI_1_5_FLASH":      _m("GEMINI_1_5_FLASH",      "GEMINI_2_5_FLASH"),
-    "GPT_4O":                _m("GPT_4_1_2025_04_14",    "GEMINI_2_5_FLASH"),
-    "GPT_4_1_2025_04_14":    _m("GPT_4_1_2025_04_14",    "GEMINI_2_5_FLASH"),
-    "CLAUDE_3_7_SONNET":     _m("CLAUDE_SONNET_4_5",     "GEMINI_2_5_FLASH"),
+    "GEMINI_2_0_FLASH":      ("GEMINI_2_5_FLASH", None),
+    "GEMINI_1_5_FLASH":      ("GEMINI_1_5_FLASH",      "GEMINI_2_5_FLASH"),
+    "GPT_4O":                ("GPT_4_1_2025_04_14",    "GEMINI_2_5_FLASH"),
+    "GPT_4_1_2025_04_14":    ("GPT_4_1_2025_04_14",    "GEMINI_2_5_FLASH"),
+    "CLAUDE_3_7_SONNET":     ("CLAUDE_SONNET_4_5",     "GEMINI_2_5_FLASH"),
     # Front-end dropdown values
-    "GEMINI_2_5_FLASH":      _m("GEMINI_2_5_FLASH",      "GEMINI_2_5_FLASH"),
-    "GEMINI_2_5_PRO":        _m("GEMINI_2_5_PRO",        "GEMINI_2_5_FLASH"),
-    "GEMINI_3_FLASH":        _m("GEMINI_3_FLASH",        "GEMINI_2_5_FLASH"),
-    "GPT_5_MINI":            _m("GPT_5_MINI",            "GPT_4_1_2025_04_14"),
-    "GPT_5":                 _m("GPT_5",                 "GPT_4_1_2025_04_14"),
-    "O4_MINI":               _m("O4_MINI",               "GPT_4_1_2025_04_14"),
-    "GEMINI_2_5_FLASH_LITE": _m("GEMINI_2_5_FLASH_LITE", "GEMINI_2_5_FLASH"),
-    "CLAUDE_HAIKU_4_5":      _m("CLAUDE_HAIKU_4_5",      "GEMINI_2_5_FLASH"),
-    "CLAUDE_SONNET_4_5":     _m("CLAUDE_SONNET_4_5",     "GEMINI_2_5_FLASH"),
-    "CLAUDE_SONNET_4_6":     _m("CLAUDE_SONNET_4_6",     "GEMINI_2_5_FLASH"),
-    "GROK_4_FAST":           _m("GROK_4_FAST",           "GEMINI_2_5_FLASH"),
+    "GEMINI_2_5_FLASH":      ("GEMINI_2_5_FLASH",      "GEMINI_2_5_FLASH"),
+    "GEMINI_2_5_PRO":        ("GEMINI_2_5_PRO",        "GEMINI_2_5_FLASH"),
+    "GEMINI_3_FLASH":        ("GEMINI_3_FLASH",        "GEMINI_2_5_FLASH"),
+    "GPT_5_MINI":            ("GPT_5_MINI",            "GPT_4_1_2025_04_14"),
+    "GPT_5":                 ("GPT_5",                 "GPT_4_1_2025_04_14"),
+    "O4_MINI":               ("O4_MINI",               "GPT_4_1_2025_04_14"),
+    "GEMINI_2_5_FLASH_LITE": ("GEMINI_2_5_FLASH_LITE", "GEMINI_2_5_FLASH"),
+    "CLAUDE_HAIKU_4_5":      ("CLAUDE_HAIKU_4_5",      "GEMINI_2_5_FLASH"),
+    "CLAUDE_SONNET_4_5":     ("CLAUDE_SONNET_4_5",     "GEMINI_2_5_FLASH"),
+    "CLAUDE_SONNET_4_6":     ("CLAUDE_SONNET_4_6",     "GEMINI_2_5_FLASH"),
+    "GROK_4_FAST":           ("GROK_4_FAST",           "GEMINI_2_5_FLASH"),
 }
 
-ACTIVE_MODEL = _m("GEMINI_2_5_FLASH_LITE")
+MODELS = {}
+ACTIVE_MODEL = None
 ACTIVE_MODEL_NAME = "GEMINI_2_5_FLASH_LITE"
 
+def load_models():
+    """Resolve MODEL_SPECS against og.TEE_LLM (imports the SDK on first call)."""
+    global ACTIVE_MODEL
+    if not MODELS:
+        with startup.timed("init", "models"):
+            resolved = {name: _m(*spec) for name, spec in MODEL_SPECS.items()}
+            ACTIVE_MODEL = _m("GEMINI_2_5_FLASH_LITE")
+            MODELS.update(resolved)
+    return MODELS
+
 def make_llm():
     """Create og.LLM for 0.9.3"""
     if not PRIVATE_KEY:
@@ -120,6 +180,19 @@ def make_llm():
         print(f"[LLM] Init error: {e}")
         return None
 
+llm_pool = LLMPool(make_llm)
+
+WARMUP = os.environ.get("AUDITOR_WARMUP", "1") != "0"
+
+def warm_up():
+    """Load the SDKs and derive the wallet off the request path."""
+    with startup.timed("init", "warm_up"):
+        for step in (load_models, get_wallet, cached_balance):
+            try:
+                step()
+            except Exception as e:
+                print(f"[BOOT] Warm-up step {step.__name__} failed: {e}")
+
 # ── System prompt ──
 AUDIT_SYSTEM_PROMPT = """You are a senior smart contract security auditor.
 Your goal is to provide accurate, stable, and deterministic vulnerability analysis for Solidity contracts.
@@ -220,67 +293,41 @@ CHECK FOR:
 Return the CORRECTED JSON in the exact same structure. Keep valid entries unchanged.
 If no vulnerabilities remain, set risk_score to 0 and summary must include 'No critical vulnerabilities found'."""
 
-audit_history = []
-
-def repair_json(s):
-    s = s.strip()
-    if not s:
-        return "{}"
-    in_string = False
-    escape = False
-    stack = []
-    for char in s:
-        if escape:
-            escape = False
-            continue
-        if char == '\\':
-            escape = True
-            continue
-        if char == '"':
-            in_string = not in_string
-            continue
-        if not in_string:
-            if char == '{': stack.append('}')
-            elif char == '[': stack.append(']')
-            elif char == '}':
-                if stack and stack[-1] == '}': stack.pop()
-            elif char == ']':
-                if stack and stack[-1] == ']': stack.pop()
-    if in_string:
-        if s.endswith('\\'): s = s[:-1]
-        s += '"'
-    while stack:
-        s += stack.pop()
-    return s
+# Bump whenever either prompt changes so cached reports are not reused across prompt versions.
+# The review policy is part of it: adaptive and full reviews can produce different reports.
+PROMPT_VERSION = hashlib.sha256((AUDIT_SYSTEM_PROMPT + REVIEW_SYSTEM_PROMPT + review_policy.config_tag())
+                                .encode()).hexdigest()[:12]
+
+history = HistoryStore()
+flights = SingleFlight()
+with startup.timed("init", "audit_cache"):
+    audit_cache = AuditCache()
 
 def parse_llm_json(raw):
-    s = raw.strip()
-    if "```json" in s:
-        s = s.split("```json")[1].split("```")[0]
-    elif "```" in s:
-        parts = s.split("```")
-        if len(parts) > 1:
-            s = parts[1]
-            if s.startswith("json"): s = s[4:]
-    s = s.strip()
-    try:
-        return json.loads(s)
-    except:
-        pass
-    try:
-        return json.loads(repair_json(s))
-    except:
-        pass
-    match = re.search(r'(\{.*)', s, re.DOTALL)
-    if match:
-        try:
-            return json.loads(repair_json(match.group(1)))
-        except:
-            pass
-    return None
+    """Report dict from an LLM response. A truncated response yields the findings that were
+    complete before the cut, flagged with "truncated": True."""
+    t0 = time.perf_counter()
+    parsed, truncated = llm_json.parse(str(raw or ""))
+    metrics.parse_seconds.observe(time.perf_counter() - t0)
+    if not isinstance(parsed, dict):
+        metrics.parse_results.inc("failed")
+        return None
+    metrics.parse_results.inc("truncated" if truncated else "ok")
+    if truncated:
+        print(f"[Audit] Response truncated — salvaged {len(parsed.get('vulnerabilities') or [])} finding(s)")
+        parsed["truncated"] = True
+        parsed.setdefault("summary", "AI response was truncated; findings before the cut-off were recovered.")
+        parsed.setdefault("risk_score", 50)
+        for k in ("vulnerabilities", "gas_optimizations", "best_practices"):
+            parsed.setdefault(k, [])
+    return parsed
 
 # ── Flask routes ──
 
+@app.before_request
+def note_first_request():
+    startup.mark_first_request()
+
 @app.after_request
 def cors_headers(r):
     r.headers["Access-Control-Allow-Origin"]  = "*"
@@ -294,16 +341,231 @@ def index():
 
 @app.route("/api/status")
 def status():
+    balance, balance_age_ms = cached_balance()
     return jsonify({
-        "wallet": WALLET,
-        "balance": get_opg_balance(),
+        "wallet": get_wallet(),
+        "balance": balance,
+        "balance_age_ms": balance_age_ms,
         "model": ACTIVE_MODEL_NAME,
-        "total_audits": len(audit_history)
+        "total_audits": history.total()
     })
 
-llm_lock = threading.Lock()
-MAX_RETRIES = 3
-RETRY_DELAY = 1
+dispatcher = InferenceDispatcher()
+retry_stats = RetryStats()
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 120))
+
+def _chat_call(llm, model, messages):
+    return llm.chat(
+        model=model,
+        messages=messages,
+        max_tokens=1000,
+        temperature=0.0,
+        x402_settlement_mode=og.x402SettlementMode.BATCH_HASHED
+    )
+
+def _chat_text(result):
+    """Safely extract (text, payment_hash) from a chat result in 0.9.3"""
+    raw_output = getattr(result, "chat_output", None)
+    if isinstance(raw_output, dict):
+        raw = raw_output.get("content", "")
+    elif hasattr(raw_output, "content"):
+        raw = getattr(raw_output, "content")
+    else:
+        raw = str(raw_output) or ""
+    return raw, getattr(result, "payment_hash", None)
+
+def _record_call(model_name, call, seconds, result):
+    """Latency and size of a successful LLM call; returns (text, payment_hash)."""
+    text, phash = _chat_text(result)
+    hedger.record(model_name, seconds)
+    metrics.inference_seconds.observe(seconds, model_name, call)
+    metrics.output_bytes.observe(len(text or ""), model_name)
+    return text, phash
+
+def run_chat(llm, model, model_name, messages, call="review"):
+    """Run one chat call inside a dispatcher slot; returns (text, payment_hash)."""
+    metrics.queue_wait_seconds.observe(dispatcher.acquire(model_name), model_name)
+    try:
+        t0 = time.monotonic()
+        result = event_loop.run(_chat_call(llm, model, messages), timeout=LLM_TIMEOUT)
+        seconds = time.monotonic() - t0
+    finally:
+        dispatcher.release(model_name)
+    return _record_call(model_name, call, seconds, result)
+
+hedger = Hedger()
+def backend_of(model_name):
+    """TEE_LLM member a MODEL_SPECS name resolves to (aliases can share one)."""
+    member = load_models().get(model_name)
+    return getattr(member, "name", None) or (str(member) if member is not None else model_name)
+
+router = Router(resolve=backend_of)
+
+def hedge_backup(model_name):
+    """Backup model for hedging: HEDGE_BACKUP, else the fallback in MODEL_SPECS. None if that
+    is the same model (by name or resolved TEE_LLM member): a hedge would only pay twice."""
+    backup = HEDGE_BACKUP or MODEL_SPECS.get(model_name, (None, None))[1]
+    if backup not in MODEL_SPECS or backup == model_name or backend_of(backup) == backend_of(model_name):
+        return None
+    return backup
+
+async def _acquire(name, blocking=True):
+    """Dispatcher slot from the event loop: a free slot is taken inline, otherwise the coroutine
+    queues on a future in the dispatcher's FIFO. Returns False if not blocking and none is free."""
+    if dispatcher.try_acquire(name):
+        metrics.queue_wait_seconds.observe(0.0, name)
+        return True
+    if not blocking:
+        return False
+    metrics.queue_wait_seconds.observe(await dispatcher.acquire_async(name), name)
+    return True
+
+async def achat(llm, model, model_name, messages, call="first_pass"):
+    """run_chat for code already on the event loop; returns (text, payment_hash)."""
+    await _acquire(model_name)
+    try:
+        t0 = time.monotonic()
+        result = await asyncio.wait_for(_chat_call(llm, model, messages), LLM_TIMEOUT)
+        seconds = time.monotonic() - t0
+    finally:
+        dispatcher.release(model_name)
+    return _record_call(model_name, call, seconds, result)
+
+async def achat_hedged(llm, model, model_name, messages):
+    """Like achat, but with HEDGE=1 a backup model is raced against a slow primary.
+    Returns (text, payment_hash, hedge_info); hedge_info is None when hedging is off."""
+    backup = hedge_backup(model_name) if HEDGE_ENABLED else None
+    if not backup:
+        return await achat(llm, model, model_name, messages) + (None,)
+
+    async def start(name, blocking):
+        if not await _acquire(name, blocking):
+            return None
+        t0 = time.monotonic()
+        task = asyncio.ensure_future(_chat_call(llm, load_models().get(name, model), messages))
+
+        def done(t):
+            dispatcher.release(name)
+            if not t.cancelled() and t.exception() is None:
+                _record_call(name, "first_pass", time.monotonic() - t0, t.result())
+        task.add_done_callback(done)
+        return task
+
+    result, winner, info = await hedger.run(model_name, backup, start,
+                                            lambda r: parse_llm_json(_chat_text(r)[0]) is not None, LLM_TIMEOUT)
+    return _chat_text(result) + (info,)
+
+def record_failure(model_name, exc, seconds):
+    """Count a failed call against the model's health and return its error class. A dispatcher
+    queue timeout never reached the model and a 402 is the wallet's problem, so neither counts."""
+    error_class = classify_error(exc)
+    if not isinstance(exc, QueueTimeout) and error_class != "payment":
+        router.record(model_name, False, seconds, error_class)
+    return error_class
+
+async def first_pass(llm, messages, target_model, target_model_name):
+    """First-pass attempts under the retry policy, run on the event loop so backoff is an
+    asyncio.sleep rather than a parked thread. Payment/auth/invalid errors stop at once,
+    an unparsable reply gets a JSON repair call, anything else backs off and is retried
+    (on another model if the router prefers). Returns a dict with parsed, phash, model_name,
+    ms, error, extras and llm_ok."""
+    budget = Budget()
+    out = {"parsed": None, "phash": None, "model_name": target_model_name, "ms": 0.0,
+           "error": None, "extras": {}, "llm_ok": True}
+    failed, retries, aborted = set(), [], None
+    repair = None  # (model_name, model, raw) of the last unparsable reply
+    salvage = None  # last truncated reply with nothing salvaged; returned only if every attempt fails
+    model_name, model = target_model_name, target_model
+    routed = target_model_name
+
+    while True:
+        budget.attempts += 1
+        attempt, raw, error_class = budget.attempts, None, None
+        t0 = time.perf_counter()
+        try:
+            if repair:
+                model_name, model, bad_raw = repair
+                print(f"[Audit] Attempt {attempt}/{budget.max_attempts}: JSON repair with {model_name}...")
+                raw, phash = await asyncio.wait_for(achat(llm, model, model_name, repair_messages(bad_raw)),
+                                                    budget.remaining())
+                hedge_info = None
+            else:
+                model_name = routed = router.choose(target_model_name,
+                                                    MODEL_SPECS.get(target_model_name, (None, None))[1], failed)
+                model = target_model if model_name == target_model_name else load_models().get(model_name, target_model)
+                print(f"[Audit] Attempt {attempt}/{budget.max_attempts} with {model_name}...")
+                raw, phash, hedge_info = await asyncio.wait_for(achat_hedged(llm, model, model_name, messages),
+                                                                budget.remaining())
+            ms = round((time.perf_counter() - t0) * 1000, 1)
+            if hedge_info:
+                out["extras"]["hedge"] = hedge_info
+                model_name = hedge_info["winner"]
+            parsed = parse_llm_json(raw)
+            if parsed and parsed.get("truncated") and not parsed.get("vulnerabilities"):
+                # Cut off before the first finding: nothing worth keeping, ask again
+                error_class = "truncated"
+                salvage = (parsed, phash, model_name, ms)
+                router.record(model_name, False, ms / 1000, error_class)
+                out["error"] = "LLM response was truncated before any finding"
+                print(f"[Audit] Attempt {attempt}: response truncated with no findings")
+            elif parsed:
+                router.record(model_name, True, ms / 1000)
+                print(f"[Audit] Attempt {attempt} SUCCESS!")
+                out.update(parsed=parsed, phash=phash, model_name=model_name, ms=ms, error=None)
+                break
+            else:
+                error_class = "parse"
+                router.record(model_name, False, ms / 1000, error_class)
+                out["error"] = "LLM response could not be parsed as JSON: " + str(raw)[:50]
+                print(f"[Audit] Attempt {attempt}: got response but JSON parse failed")
+        except Exception as e:
+            error_class = record_failure(model_name, e, time.perf_counter() - t0)
+            out["error"] = str(e) or error_class
+            print(f"[Audit] Attempt {attempt} error ({error_class}): {out['error']}")
+
+        kind = kind_of(error_class)
+        if kind == NON_RETRYABLE:
+            print(f"[Audit] {error_class} errors are not retryable — giving up")
+            aborted = NON_RETRYABLE
+            break
+        # One repair per unparsable reply; a failed repair (or a reply with no JSON at all) is resent in full
+        if kind == PARSE and not repair and "{" in str(raw):
+            repair = (model_name, model, raw)
+        else:
+            kind = RETRYABLE if kind == PARSE else kind
+            repair = None
+            failed.add(model_name)
+        delay = budget.next_delay(kind)
+        if delay is None:
+            aborted = "budget"
+            break
+        retries.append(kind)
+        if delay:
+            print(f"[Audit] Waiting {delay:.1f}s before retry...")
+            await asyncio.sleep(delay)
+
+    if out["parsed"] is None and salvage is not None:
+        parsed, phash, model_name, ms = salvage
+        out.update(parsed=parsed, phash=phash, model_name=model_name, ms=ms, error=None)
+    out["llm_ok"] = error_class in (None, "parse", "truncated")
+    aborted = aborted if out["parsed"] is None else None
+    retry_stats.record(retries, aborted)
+    for kind in retries:
+        metrics.retries.inc(kind)
+    if aborted:
+        metrics.retry_aborts.inc(aborted)
+    if retries:
+        out["extras"]["retry"] = {"attempts": budget.attempts, "retries": retries}
+    if out["parsed"] is not None and out["model_name"] != target_model_name:
+        # Answered by another model (rerouted, or a hedge the backup won): never cached under the requested one
+        reason = f"{target_model_name} unavailable (circuit open or failed this request)" \
+            if routed != target_model_name else f"hedged: {out['model_name']} answered before {target_model_name}"
+        out["extras"]["routing"] = {"requested": target_model_name, "used": out["model_name"], "reason": reason}
+    return out
+
+def answered_by(report, default):
+    """Model that produced a report: the routing target when it was rerouted or hedged."""
+    return (report.get("routing") or {}).get("used") or default
 
 @app.route("/api/audit", methods=["POST","OPTIONS"])
 def audit():
@@ -317,174 +579,497 @@ def audit():
     if not code:
         return jsonify({"success": False, "error": "No code provided"}), 400
 
-    target_model = MODELS.get(req_model, ACTIVE_MODEL)
-    target_model_name = req_model if req_model in MODELS else ACTIVE_MODEL_NAME
+    if request.args.get("async") in ("1", "true"):
+        try:
+            job_id = jobs.submit(run_audit, code, req_model, None, data.get("mode"), data.get("base"))
+        except QueueFull as e:
+            return jsonify({"success": False, "error": str(e)}), 503
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "status": "queued",
+            "poll": f"/api/audit/{job_id}",
+            "events": f"/api/audit/{job_id}/events",
+        }), 202
+
+    body, status = run_audit(code, req_model, mode=data.get("mode"), base=data.get("base"))
+    return jsonify(body), status
+
+def run_audit(code, req_model, on_event=None, mode=None, base=None):
+    """Full audit pipeline (cache, first pass, review pass); returns (body, http_status).
+    on_event(name, data) is called with intermediate results for streaming clients.
+    mode is "single", "chunked", or None to chunk automatically above CHUNK_AUTO_TOKENS.
+    base (a previous audit_id or code_hash) enables incremental re-audit of changed units."""
+    metrics.input_bytes.observe(len(code.encode()))
+    t0 = time.perf_counter()
+    code_hash = hashlib.sha256(code.encode()).hexdigest()[:16]
+    model_name = req_model if req_model in MODEL_SPECS else ACTIVE_MODEL_NAME
+    # Identical requests already in flight share its LLM calls instead of paying for their own
+    (body, status), joined = flights.do((code_hash, model_name, mode, base),
+                                        lambda: _run_audit(code, req_model, on_event, mode, base))
+    if joined:
+        body, status = coalesced_audit(body, status, code, joined)
+    audit = body.get("audit") or {}
+    metrics.phase_seconds.observe(time.perf_counter() - t0, "total", model_name)
+    metrics.audits.inc("ok" if status == 200 else "error", audit.get("cache", "miss"))
+    return body, status
+
+def coalesced_audit(body, status, code, joined):
+    """Copy of an in-flight audit's result for a request that joined it, under its own audit_id."""
+    leader = body.get("audit")
+    if status != 200 or not leader:
+        return body, status
+    parsed = json.loads(json.dumps(leader))
+    parsed["coalesced_with"] = leader["audit_id"]
+    parsed["cached_payment_hash"] = leader.get("payment_hash")
+    print(f"[Audit] {leader['code_hash']} joined in-flight audit {leader['audit_id']}")
+    return finish_audit(parsed, f"{leader['audit_id']}-{joined}", leader["code_hash"],
+                        None, leader["model"], code, "coalesced")
+
+def _run_audit(code, req_model, on_event, mode, base):
+    emit = on_event or (lambda name, data: None)
+    target_model = load_models().get(req_model, ACTIVE_MODEL)
+    target_model_name = req_model if req_model in MODEL_SPECS else ACTIVE_MODEL_NAME
 
     code_hash = hashlib.sha256(code.encode()).hexdigest()[:16]
     audit_id  = f"AUDIT-{code_hash}-{int(time.time())}"
 
+    analysis = analyze(code)
+    metrics.phase_seconds.observe(analysis["ms"] / 1000, "static_analysis", target_model_name)
+    static_info = {"findings": len(analysis["findings"]), "facts": analysis["facts"], "ms": analysis["ms"]}
+    if analysis["trivial"]:
+        print(f"[Audit] {code_hash} has no executable code — answered by static analysis")
+        parsed = local_report(analysis)
+        parsed["static_analysis"] = static_info
+        return finish_audit(parsed, audit_id, code_hash, None, target_model_name, code, "bypass")
+    facts = facts_prompt(analysis)
+
+    want_chunks = mode == "chunked" or (mode != "single" and estimate_tokens(code) > CHUNK_AUTO_TOKENS)
+    chunks = plan_chunks(code) if want_chunks else [code]
+    chunked = len(chunks) > 1
+    ckey = cache_key(code, target_model_name + ("/chunked" if chunked else ""), PROMPT_VERSION)
+    cached = audit_cache.get(ckey) if CACHE_ENABLED else None
+    if cached:
+        print(f"[Audit] Cache hit for {code_hash} ({target_model_name})")
+        # Nothing was paid for this request: the original settlement is reported separately
+        report = dict(cached["report"], cached_payment_hash=cached.get("payment_hash"))
+        return finish_audit(report, audit_id, code_hash, None, target_model_name, code, "hit")
+
+    inc_info, inc_plan, premerged = None, None, None
+    if base:
+        snap = snapshots.load(base)
+        inc_plan = incremental.plan(code, snap) if snap else None
+        if inc_plan is None:
+            inc_info = {"base": base, "applied": False,
+                        "reason": "base audit not found" if not snap else "too many units changed"}
+
+    if inc_plan is not None:
+        parsed, phash, last_error, tokens = audit_incremental(code, inc_plan, snap, target_model,
+                                                              target_model_name, emit, facts)
+        inc_info = {"base": base, "applied": True, "changed_units": inc_plan["changed"],
+                    "reaudited_units": inc_plan["reaudit"], "context_units": inc_plan["deps"],
+                    "carried_findings": len(inc_plan["carried"])}
+    elif chunked:
+        parsed, phash, last_error, tokens = audit_chunked(chunks, target_model, target_model_name, emit, facts)
+    else:
+        with metrics.phase_seconds.time("compaction", target_model_name):
+            source, line_map = compact(code) if COMPACT_ENABLED else (code, None)
+        tokens = {"original": estimate_tokens(code), "compacted": estimate_tokens(source)}
+        # Static findings join the first pass in prompt numbering, so the review can drop false positives
+        local = {"vulnerabilities": [dict(f) for f in analysis["findings"]]}
+        if line_map:
+            remap_line_hints(local, invert_line_map(line_map, code.count("\n") + 1))
+        premerged = dict(analysis, findings=local["vulnerabilities"])
+
+        def on_first_pass(first, phash):
+            first = json.loads(json.dumps(first))
+            if line_map:
+                remap_line_hints(first, line_map)
+            emit("first_pass", {"audit": annotate_report(first, audit_id, code_hash, phash,
+                                                         answered_by(first, target_model_name), code, "miss")})
+        parsed, phash, last_error = audit_source(source, target_model, target_model_name, emit, on_first_pass,
+                                                 facts, premerged)
+        if parsed and line_map:
+            remap_line_hints(parsed, line_map)
+
+    if parsed is None:
+        if last_error:
+            return {"success": False, "error": last_error}, 500
+        parsed = {
+            "summary": "AI response was truncated. Please try again.",
+            "risk_score": 50,
+            "vulnerabilities": [],
+            "gas_optimizations": [],
+            "best_practices": [],
+        }
+    else:
+        if premerged is None:
+            merge_findings(parsed, analysis)
+        parsed["static_analysis"] = static_info
+        parsed["prompt_tokens"] = tokens
+        if CACHE_ENABLED and not inc_plan and "routing" not in parsed and not parsed.get("truncated"):
+            audit_cache.put(ckey, {"report": parsed, "payment_hash": phash})
+        snapshots.save(audit_id, code_hash, target_model_name, incremental.snapshot(code, parsed))
+    if inc_info:
+        parsed["incremental"] = inc_info
+
+    return finish_audit(parsed, audit_id, code_hash, phash, answered_by(parsed, target_model_name), code, "miss")
+
+def audit_source(code, target_model, target_model_name, emit=None, on_first_pass=None, facts="", analysis=None):
+    """First pass (with retries) and review pass over one source text.
+    facts is appended to both user messages (static analysis results); analysis, if given, holds
+    static findings in this source's line numbering, merged into the first pass before review.
+    Returns (parsed, payment_hash, last_error); parsed is None if every attempt failed."""
+    emit = emit or (lambda name, data: None)
     messages = [
         {"role": "system", "content": AUDIT_SYSTEM_PROMPT},
-        {"role": "user",   "content": f"Audit this Solidity contract:\n\n{code}"}
+        {"role": "user",   "content": f"Audit this Solidity contract:\n\n{code}{facts}"}
     ]
 
-    last_error = None
-    parsed = None
-    phash = None
-
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            llm = make_llm()
-            if not llm:
-                return jsonify({"success": False, "error": "SDK not initialized. Check OG_PRIVATE_KEY."}), 500
-
-            print(f"[Audit] Attempt {attempt}/{MAX_RETRIES} with {target_model_name}...")
-
-            with llm_lock:
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_closed():
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                    result = loop.run_until_complete(llm.chat(
-                        model=target_model,
-                        messages=messages,
-                        max_tokens=1000,
-                        temperature=0.0,
-                        x402_settlement_mode=og.x402SettlementMode.BATCH_HASHED
-                    ))
-                except RuntimeError:
-                    result = asyncio.run(llm.chat(
-                        model=target_model,
-                        messages=messages,
-                        max_tokens=1000,
-                        temperature=0.0,
-                        x402_settlement_mode=og.x402SettlementMode.BATCH_HASHED
-                    ))
-
-            # Safely extract response text in 0.9.3
-            raw_output = getattr(result, "chat_output", None)
-            if isinstance(raw_output, dict):
-                raw = raw_output.get("content", "")
-            elif hasattr(raw_output, "content"):
-                raw = getattr(raw_output, "content")
-            else:
-                raw = str(raw_output) or ""
-                
-            phash = getattr(result, "payment_hash", None)
-            parsed = parse_llm_json(raw)
-
-            if parsed:
-                print(f"[Audit] Attempt {attempt} SUCCESS!")
-                break
-            else:
-                print(f"[Audit] Attempt {attempt}: got response but JSON parse failed")
-                last_error = "LLM response could not be parsed as JSON: " + str(raw)[:50]
-
-        except Exception as e:
-            last_error = str(e)
-            print(f"[Audit] Attempt {attempt} error: {last_error}")
-
-        if attempt < MAX_RETRIES:
-            delay = RETRY_DELAY * attempt
-            print(f"[Audit] Waiting {delay}s before retry...")
-            time.sleep(delay)
-
-    # ── Second pass: Re-evaluation ──
+    p = llm_pool.checkout()
+    if p is None:
+        return None, None, "SDK not initialized. Check OG_PRIVATE_KEY."
+    fp = None
+    try:
+        fp = event_loop.run(first_pass(p.client, messages, target_model, target_model_name),
+                            timeout=RETRY_BUDGET + LLM_TIMEOUT)
+    except Exception as e:
+        print(f"[Audit] First pass error: {e}")
+        return None, None, str(e)
+    finally:
+        llm_pool.checkin("default", p, fp is not None and fp["llm_ok"])
+    parsed, phash, last_error = fp["parsed"], fp["phash"], fp["error"]
+    model_name, first_pass_ms, extras = fp["model_name"], fp["ms"], fp["extras"]
+    metrics.phase_seconds.observe(first_pass_ms / 1000, "first_pass", model_name)
+
+    # ── Second pass: Re-evaluation (policy-driven) ──
     if parsed:
+        if analysis is not None:
+            merge_findings(parsed, analysis)
+        policy, indices, reason = review_policy.decide(parsed, code)
+        review_name = review_policy.REVIEW_MODEL if review_policy.REVIEW_MODEL in MODEL_SPECS else model_name
+        review_info = {"policy": policy, "reason": reason, "model": review_name,
+                       "reviewed": len(indices), "findings": len(parsed.get("vulnerabilities") or []),
+                       "first_pass_ms": first_pass_ms, "review_ms": 0}
+        if policy in ("skip", "off"):
+            print(f"[Audit] Review skipped: {reason}")
+            review_info["saved_ms_est"] = first_pass_ms
+            parsed["review"] = review_info
+            parsed.update(extras)
+            return parsed, phash, last_error
+
+        if on_first_pass:
+            on_first_pass(dict(parsed, **extras), phash)
+        kept_reason = "review produced no usable JSON"
+        t0 = time.perf_counter()
         try:
-            print(f"[Audit] Running re-evaluation pass...")
+            print(f"[Audit] Running re-evaluation pass ({policy}, {len(indices)} finding(s), {review_name})...")
+            prior = parsed if policy == "full" else review_policy.subset_report(parsed, indices)
             review_messages = [
                 {"role": "system", "content": REVIEW_SYSTEM_PROMPT},
-                {"role": "user", "content": f"Original Solidity code:\n\n{code}\n\nPrevious audit report:\n\n{json.dumps(parsed, indent=2)}\n\nRe-evaluate and return corrected JSON."}
+                {"role": "user", "content": f"Original Solidity code:\n\n{code}\n\nPrevious audit report:\n\n{json.dumps(prior, indent=2)}{facts}\n\nRe-evaluate and return corrected JSON."}
             ]
 
-            llm = make_llm()
-            if llm:
-                with llm_lock:
+            with llm_pool.client() as llm:
+                if llm:
+                    review_model = load_models().get(review_name, target_model)
                     try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_closed():
-                            loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(loop)
-                        review_result = loop.run_until_complete(llm.chat(
-                            model=target_model,
-                            messages=review_messages,
-                            max_tokens=1000,
-                            temperature=0.0,
-                            x402_settlement_mode=og.x402SettlementMode.BATCH_HASHED
-                        ))
-                    except RuntimeError:
-                        review_result = asyncio.run(llm.chat(
-                            model=target_model,
-                            messages=review_messages,
-                            max_tokens=1000,
-                            temperature=0.0,
-                            x402_settlement_mode=og.x402SettlementMode.BATCH_HASHED
-                        ))
-
-                review_output = getattr(review_result, "chat_output", None)
-                if isinstance(review_output, dict):
-                    review_raw = review_output.get("content", "")
-                elif hasattr(review_output, "content"):
-                    review_raw = getattr(review_output, "content")
-                else:
-                    review_raw = str(review_output) or ""
-
-                review_parsed = parse_llm_json(review_raw)
-                if review_parsed:
-                    print(f"[Audit] Re-evaluation SUCCESS — using corrected report")
-                    parsed = review_parsed
-                else:
-                    print(f"[Audit] Re-evaluation JSON parse failed — keeping original")
+                        review_raw, _ = run_chat(llm, review_model, review_name, review_messages)
+                    except Exception as e:
+                        record_failure(review_name, e, time.perf_counter() - t0)
+                        raise
+                    review_parsed = parse_llm_json(review_raw)
+                    router.record(review_name, review_parsed is not None, time.perf_counter() - t0,
+                                  None if review_parsed else "parse")
+                    if review_parsed and review_parsed.get("truncated"):
+                        print(f"[Audit] Re-evaluation truncated — keeping original")
+                        kept_reason = "review reply was truncated"
+                    elif review_parsed:
+                        print(f"[Audit] Re-evaluation SUCCESS — using corrected report")
+                        if policy == "full":
+                            parsed = dict(review_parsed, **{k: items(review_parsed, k) for k in
+                                          ("vulnerabilities", "gas_optimizations", "best_practices")})
+                        else:
+                            parsed = review_policy.merge_subset(parsed, indices, review_parsed)
+                        kept_reason = None
+                    else:
+                        print(f"[Audit] Re-evaluation JSON parse failed — keeping original")
         except Exception as e:
             print(f"[Audit] Re-evaluation error (keeping original): {e}")
+            kept_reason = f"review failed: {e}"
+        if kept_reason:
+            emit("review_kept", {"reason": kept_reason})
+        review_info["review_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        metrics.phase_seconds.observe(review_info["review_ms"] / 1000, "review", review_name)
+        # A full review costs about as much as the first pass; the estimate is what was not spent
+        review_info["saved_ms_est"] = max(0.0, round(first_pass_ms - review_info["review_ms"], 1)) \
+            if policy == "subset" else 0.0
+        parsed["review"] = review_info
+        parsed.update(extras)
+
+    return parsed, phash, last_error
+
+snapshots = incremental.SnapshotStore()
+chunk_pool = ThreadPoolExecutor(max_workers=CHUNK_WORKERS, thread_name_prefix="audit-chunk")
+
+def marked_source(text):
+    """Prompt text for rendered (marker-annotated) code: markers removed, compacted, plus the
+    map from prompt line numbers to original line numbers for remap_line_hints."""
+    text, origin = strip_markers(text)
+    source, line_map = compact(text) if COMPACT_ENABLED else (text, list(range(1, len(origin) + 1)))
+    return source, [origin[n - 1] or n for n in line_map]
+
+def audit_chunked(chunks, target_model, target_model_name, emit, facts=""):
+    """Audit token-bounded chunks concurrently and merge them into one report.
+    Returns (parsed, payment_hash, last_error, prompt_tokens)."""
+    print(f"[Audit] Chunked mode: {len(chunks)} chunks")
+    sources = [marked_source(text) for text in chunks]
+    tokens = {"original": sum(estimate_tokens(t) for t in chunks),
+              "compacted": sum(estimate_tokens(s) for s, _ in sources)}
+    futures = [chunk_pool.submit(audit_source, text, target_model, target_model_name, None, None, facts)
+               for text, _ in sources]
+    reports, phash, last_error = [], None, None
+    for i, fut in enumerate(futures):
+        parsed, chunk_phash, err = fut.result()
+        if parsed:
+            reports.append(remap_line_hints(parsed, sources[i][1]))
+            phash = phash or chunk_phash
+        else:
+            last_error = err
+        emit("chunk_done", {"index": i + 1, "total": len(chunks), "ok": bool(parsed)})
+    if not reports:
+        return None, None, last_error, tokens
+    return merge_reports(reports, total_chunks=len(chunks)), phash, None, tokens
+
+def audit_incremental(code, inc_plan, snap, target_model, target_model_name, emit, facts=""):
+    """Re-audit only the changed units of code and carry over the rest from snap.
+    Returns (parsed, payment_hash, last_error, prompt_tokens)."""
+    if inc_plan["source"] is None:
+        print("[Audit] Incremental: no code units changed — carrying over previous findings")
+        return incremental.combine(code, inc_plan, snap, None), None, None, \
+            {"original": estimate_tokens(code), "compacted": 0}
+    print(f"[Audit] Incremental: re-auditing {len(inc_plan['reaudit'])} unit(s)")
+    source, line_map = marked_source(inc_plan["source"])
+    tokens = {"original": estimate_tokens(code), "compacted": estimate_tokens(source)}
+    parsed, phash, last_error = audit_source(source, target_model, target_model_name, emit, facts=facts)
+    if parsed is None:
+        return None, None, last_error, tokens
+    remap_line_hints(parsed, line_map)
+    return incremental.combine(code, inc_plan, snap, parsed), phash, None, tokens
+
+def annotate_report(parsed, audit_id, code_hash, phash, model_name, code, cache_status):
+    """Attach audit metadata and severity counts to a parsed report (in place)."""
+    parsed["audit_id"]     = audit_id
+    parsed["code_hash"]    = code_hash
+    parsed["payment_hash"] = phash
+    parsed["model"]        = model_name
+    parsed["timestamp"]    = int(time.time())
+    parsed["code_length"]  = len(code)
+    parsed["cache"]        = cache_status
+
+    sevs = {"critical":0, "high":0, "medium":0, "low":0, "info":0}
+    for v in parsed.get("vulnerabilities") or []:
+        if isinstance(v, dict):
+            sev = str(v.get("severity") or "info").lower()
+            sevs[sev] = sevs.get(sev, 0) + 1
+    parsed["severity_counts"] = sevs
+    return parsed
 
-    # Build response
+def finish_audit(parsed, audit_id, code_hash, phash, model_name, code, cache_status):
+    """Attach audit metadata, record history and build the response body."""
     try:
-        if parsed is None:
-            if last_error:
-                return jsonify({"success": False, "error": last_error}), 500
-            parsed = {
-                "summary": "AI response was truncated. Please try again.",
-                "risk_score": 50,
-                "vulnerabilities": [],
-                "gas_optimizations": [],
-                "best_practices": [],
-            }
-
-        parsed["audit_id"]     = audit_id
-        parsed["code_hash"]    = code_hash
-        parsed["payment_hash"] = phash
-        parsed["model"]        = target_model_name
-        parsed["timestamp"]    = int(time.time())
-        parsed["code_length"]  = len(code)
-
-        sevs = {"critical":0, "high":0, "medium":0, "low":0, "info":0}
-        for v in parsed.get("vulnerabilities", []):
-            sev = v.get("severity", "info").lower()
-            sevs[sev] = sevs.get(sev, 0) + 1
-        parsed["severity_counts"] = sevs
+        annotate_report(parsed, audit_id, code_hash, phash, model_name, code, cache_status)
+        sevs = parsed["severity_counts"]
 
-        audit_history.append({
+        history.add({
             "audit_id": audit_id,
             "code_hash": code_hash,
+            "model": model_name,
             "timestamp": parsed["timestamp"],
             "risk_score": parsed.get("risk_score", 0),
             "summary": parsed.get("summary", ""),
-            "severity_counts": sevs
+            "severity_counts": sevs,
+            "cache": cache_status
         })
 
-        return jsonify({"success": True, "audit": parsed})
+        return {"success": True, "audit": parsed}, 200
 
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return jsonify({"success": False, "error": str(e)}), 500
+        return {"success": False, "error": str(e)}, 500
+
+jobs = JobManager()
+SSE_HEARTBEAT = 15
+
+def _job_view(job):
+    return {k: job[k] for k in ("job_id", "status", "created", "started", "finished", "result")}
+
+@app.route("/api/audit/stream", methods=["POST","OPTIONS"])
+def audit_stream():
+    """Progressive audit over SSE: first_pass, then review_kept (optional), then done/error."""
+    if request.method == "OPTIONS":
+        return jsonify({}), 200
+
+    data = request.get_json(force=True) or {}
+    code = data.get("code", "").strip()
+    req_model = data.get("model", "GEMINI_2_5_FLASH")
+
+    if not code:
+        return jsonify({"success": False, "error": "No code provided"}), 400
+
+    events = queue.Queue()
+
+    def work():
+        try:
+            body, status = run_audit(code, req_model, on_event=lambda name, d: events.put((name, d)),
+                                     mode=data.get("mode"), base=data.get("base"))
+        except Exception as e:
+            body, status = {"success": False, "error": str(e)}, 500
+        events.put(("done" if status < 400 else "error", body))
+        return body, status
+
+    try:
+        job_id = jobs.submit(work)
+    except QueueFull as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+
+    def stream():
+        yield sse("job", {"job_id": job_id})
+        while True:
+            try:
+                name, payload = events.get(timeout=SSE_HEARTBEAT)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield sse(name, payload)
+            if name in ("done", "error"):
+                return
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+batch_pool = ThreadPoolExecutor(max_workers=batch.BATCH_CONCURRENCY, thread_name_prefix="audit-batch")
+
+@app.route("/api/audit/batch", methods=["POST","OPTIONS"])
+def audit_batch():
+    """Audit many files in one request: JSON {"files": [{"name", "code"}]} or {"sources": [...]},
+    or a multipart "archive" upload (zip / tar.gz of .sol files). Identical sources are audited
+    once. Streams one NDJSON line per unique source as it finishes, then a summary line."""
+    if request.method == "OPTIONS":
+        return jsonify({}), 200
+
+    upload = request.files.get("archive")
+    try:
+        if upload:
+            sources = batch.from_archive(upload.filename, upload.read())
+            data = request.form
+        else:
+            data = request.get_json(force=True) or {}
+            sources = batch.from_json(data)
+        groups = batch.dedupe(sources)
+    except batch.BatchError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    if not groups:
+        return jsonify({"success": False, "error": "No code provided"}), 400
+
+    req_model = data.get("model", "GEMINI_2_5_FLASH")
+    mode = data.get("mode")
+    print(f"[Batch] {len(sources)} file(s), {len(groups)} unique, model {req_model}")
+
+    def one(code):
+        try:
+            return run_audit(code, req_model, mode=mode)
+        except Exception as e:
+            return {"success": False, "error": str(e)}, 500
+
+    futures = {batch_pool.submit(one, code): (h, names) for h, code, names in groups}
+
+    def stream():
+        results = []
+        for fut in as_completed(futures):
+            h, names = futures[fut]
+            body, status = fut.result()
+            line = {"type": "result", "name": names[0], "names": names, "hash": h, "status": status}
+            line.update(body)
+            results.append(line)
+            yield json.dumps(line) + "\n"
+        yield json.dumps(batch.rollup(results, len(sources))) + "\n"
+
+    return Response(stream(), mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def unknown_job():
+    error = "Unknown or expired job id"
+    if not jobs.shared:
+        error += " (the job store is local to each worker: route job requests to the worker that accepted the job)"
+    return jsonify({"success": False, "error": error}), 404
+
+@app.route("/api/audit/<job_id>")
+def audit_job(job_id):
+    job = jobs.get(job_id)
+    if not job:
+        return unknown_job()
+    return jsonify({"success": True, "job": _job_view(job)})
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route("/api/audit/<job_id>/events")
+def audit_job_events(job_id):
+    job = jobs.get(job_id)
+    if not job:
+        return unknown_job()
+
+    def stream():
+        current = job
+        version = -1
+        while True:
+            if current is None:
+                yield sse("error", {"error": "Job expired"})
+                return
+            if current["version"] != version:
+                version = current["version"]
+                if current["status"] in ("done", "error"):
+                    yield sse(current["status"], _job_view(current))
+                    return
+                yield sse("status", {"job_id": job_id, "status": current["status"]})
+            else:
+                yield ": keep-alive\n\n"
+            current = jobs.wait(job_id, version, SSE_HEARTBEAT)
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route("/api/router")
+def router_state():
+    """Live routing state: per-model health, latency percentiles and circuit breakers."""
+    return jsonify(router.stats())
+
+@app.route("/api/metrics")
+def prometheus_metrics():
+    """Prometheus text exposition: phase/inference/queue latency histograms, sizes, retries, cache."""
+    models = dispatcher.stats()["models"]
+    metrics.in_flight.replace({(m,): s["in_flight"] for m, s in models.items()})
+    metrics.queue_depth.replace({(m,): s["queue_depth"] for m, s in models.items()})
+    cache = audit_cache.stats()
+    for tier, n in cache["hits"].items():
+        metrics.cache_hits.mirror(n, tier)
+    metrics.cache_misses.mirror(cache["misses"])
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
 
 @app.route("/api/history")
-def history():
-    return jsonify({"audits": list(reversed(audit_history[-20:]))})
+def audit_history():
+    """Newest first. Query: limit (<= HISTORY_PAGE_MAX), cursor (next_cursor of the previous page),
+    code_hash, model, since / until (unix seconds), min_risk."""
+    args = request.args
+    try:
+        ints = {k: int(args[k]) for k in ("limit", "cursor", "since", "until", "min_risk") if args.get(k)}
+    except ValueError:
+        return jsonify({"success": False, "error": "limit, cursor, since, until and min_risk must be integers"}), 400
+    entries, next_cursor = history.page(ints.pop("limit", 20), code_hash=args.get("code_hash"),
+                                        model=args.get("model"), **ints)
+    return jsonify({"audits": entries, "next_cursor": next_cursor})
 
 @app.route("/api/debug")
 def debug():
@@ -493,33 +1078,40 @@ def debug():
         "python": sys.version,
         "platform": platform.platform(),
         "og_version": getattr(og, "__version__", "unknown"),
+        "og_mock": og.stats() if OG_MOCK else None,
+        "startup": None,
         "private_key_set": bool(PRIVATE_KEY),
         "private_key_len": len(PRIVATE_KEY) if PRIVATE_KEY else 0,
-        "wallet": WALLET,
-        "nest_asyncio": False,
+        "wallet": get_wallet(),
+        "event_loop": None,
         "llm_init": None,
         "llm_error": None,
         "asyncio_test": None,
+        "cache": audit_cache.stats(),
+        "dispatcher": dispatcher.stats(),
+        "hedging": hedger.stats(),
+        "retry": retry_stats.stats(),
+        "single_flight": flights.stats(),
+        "jobs": jobs.stats(),
+        "rpc": rpc_pool.stats(),
+        "balance_error": _balance["error"],
+        "prompt_version": PROMPT_VERSION,
         "env_vars": [k for k in os.environ if "OG" in k or "PRIVATE" in k or "PORT" in k]
     }
     try:
-        import nest_asyncio
-        info["nest_asyncio"] = True
-    except:
-        pass
-    try:
-        llm = og.LLM(private_key=PRIVATE_KEY)
-        info["llm_init"] = "OK"
+        with llm_pool.client() as llm:
+            info["llm_init"] = "OK" if llm else "FAIL"
     except Exception as e:
         info["llm_init"] = "FAIL"
         info["llm_error"] = str(e)
+    info["llm_pool"] = llm_pool.stats()
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.close()
+        event_loop.run(asyncio.sleep(0), timeout=5)
         info["asyncio_test"] = "OK"
     except Exception as e:
         info["asyncio_test"] = str(e)
+    info["event_loop"] = event_loop.stats()
+    info["startup"] = startup.report()
     try:
         import opengradient as _og
         members = [x for x in dir(_og.TEE_LLM) if not x.startswith("_")]
@@ -528,6 +1120,9 @@ def debug():
         info["tee_llm_members"] = str(e)
     return jsonify(info)
 
+if WARMUP:
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     app.run(debug=False, host="0.0.0.0", port=port)
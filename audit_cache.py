@@ -0,0 +1,115 @@
+"""
+Audit result cache.
+Two tiers: an in-process LRU in front of an on-disk SQLite table.
+Keys are content-addressed: normalized source hash + model + prompt version.
+"""
+import os, json, time, sqlite3, threading, hashlib, tempfile
+from collections import OrderedDict
+
+CACHE_ENABLED = os.environ.get("AUDIT_CACHE", "1") != "0"
+CACHE_DB      = os.environ.get("AUDIT_CACHE_DB") or os.path.join(tempfile.gettempdir(), "auditor_cache.sqlite3")
+CACHE_TTL     = int(os.environ.get("AUDIT_CACHE_TTL", 7 * 24 * 3600))
+MEM_ENTRIES   = int(os.environ.get("AUDIT_CACHE_MEM_ENTRIES", 256))
+DISK_ENTRIES  = int(os.environ.get("AUDIT_CACHE_DISK_ENTRIES", 5000))
+
+def normalize_source(code):
+    """Line endings and trailing whitespace don't change the audit."""
+    lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(l.rstrip() for l in lines).strip()
+
+def cache_key(code, model_name, prompt_version):
+    src_hash = hashlib.sha256(normalize_source(code).encode()).hexdigest()
+    return hashlib.sha256(f"{src_hash}|{model_name}|{prompt_version}".encode()).hexdigest()
+
+class AuditCache:
+    def __init__(self, path=CACHE_DB, ttl=CACHE_TTL, mem_entries=MEM_ENTRIES, disk_entries=DISK_ENTRIES):
+        self.ttl = ttl
+        self.mem_entries = mem_entries
+        self.disk_entries = disk_entries
+        self._mem = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS audit_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_audit_cache_accessed ON audit_cache(accessed)")
+            self._db.commit()
+        except Exception as e:
+            print(f"[Cache] Disk tier disabled: {e}")
+            self._db = None
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                created, value = item
+                if now - created <= self.ttl:
+                    self._mem.move_to_end(key)
+                    self.hits["memory"] += 1
+                    return json.loads(value)
+                del self._mem[key]
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT value, created FROM audit_cache WHERE key = ?", (key,)).fetchone()
+                    if row and now - row[1] <= self.ttl:
+                        self._db.execute("UPDATE audit_cache SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._mem_put(key, row[1], row[0])
+                        self.hits["disk"] += 1
+                        return json.loads(row[0])
+                    if row:
+                        self._db.execute("DELETE FROM audit_cache WHERE key = ?", (key,))
+                        self._db.commit()
+                except Exception as e:
+                    print(f"[Cache] Disk read error: {e}")
+            self.misses += 1
+            return None
+
+    def put(self, key, report):
+        now = time.time()
+        value = json.dumps(report)
+        with self._lock:
+            self._mem_put(key, now, value)
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO audit_cache (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now))
+                self._db.execute("DELETE FROM audit_cache WHERE created < ?", (now - self.ttl,))
+                self._db.execute(
+                    "DELETE FROM audit_cache WHERE key NOT IN ("
+                    " SELECT key FROM audit_cache ORDER BY accessed DESC LIMIT ?)", (self.disk_entries,))
+                self._db.commit()
+            except Exception as e:
+                print(f"[Cache] Disk write error: {e}")
+
+    def _mem_put(self, key, created, value):
+        self._mem[key] = (created, value)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.mem_entries:
+            self._mem.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            disk_size = None
+            if self._db is not None:
+                try:
+                    disk_size = self._db.execute("SELECT COUNT(*) FROM audit_cache").fetchone()[0]
+                except Exception:
+                    pass
+            return {
+                "enabled": CACHE_ENABLED,
+                "memory_entries": len(self._mem),
+                "disk_entries": disk_size,
+                "hits": dict(self.hits),
+                "misses": self.misses,
+                "ttl": self.ttl,
+            }
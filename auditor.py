@@ -0,0 +1,109 @@
+"""
+Headless batch auditor.
+    python -m auditor scan <dir> [-o results.jsonl] [--workers N] [--pool thread|process] [--model M]
+Walks a directory for .sol files and audits them through the app.py pipeline (cache,
+static analysis, first pass, review pass) without starting Flask. One JSON line is
+appended per file as it finishes; re-running with the same output resumes, skipping
+files whose content was already audited successfully.
+"""
+import os, sys, json, time, hashlib, argparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+os.environ.setdefault("AUDITOR_WARMUP", "0")
+
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv"}
+
+def find_sources(root, ext=".sol", skip=SKIP_DIRS):
+    """Sorted paths of all files under root ending in ext (root may also be a single file)."""
+    if os.path.isfile(root):
+        return [root]
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in skip)
+        found += [os.path.join(dirpath, f) for f in filenames if f.endswith(ext)]
+    return sorted(found)
+
+def file_hash(code):
+    return hashlib.sha256(code.strip().encode()).hexdigest()[:16]
+
+def load_done(out_path):
+    """{path: code_hash} of successful results already in the output file."""
+    done = {}
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # partial line from an interrupted run
+            if rec.get("success") and rec.get("path"):
+                done[rec["path"]] = rec.get("code_hash")
+    return done
+
+def audit_file(path, model, mode=None):
+    """Audit one file; returns the JSONL record. Runs in a worker thread or process."""
+    import app  # imported lazily so process workers load the pipeline once each
+    t0 = time.perf_counter()
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            code = f.read().strip()
+        if not code:
+            body, status = {"success": False, "error": "Empty file"}, 400
+        else:
+            body, status = app.run_audit(code, model, mode=mode)
+    except Exception as e:
+        code, body, status = "", {"success": False, "error": str(e)}, 500
+    rec = {"path": path, "code_hash": file_hash(code) if code else None, "status": status,
+           "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1)}
+    rec.update(body)
+    return rec
+
+def scan(args):
+    paths = find_sources(args.root)
+    done = {} if args.restart else load_done(args.output)
+    todo = []
+    for p in paths:
+        if p in done:
+            with open(p, encoding="utf-8", errors="replace") as f:
+                if file_hash(f.read()) == done[p]:
+                    continue
+        todo.append(p)
+    print(f"[Scan] {len(paths)} file(s) under {args.root}, {len(paths) - len(todo)} already audited, "
+          f"{len(todo)} to go ({args.workers} {args.pool} worker(s))", file=sys.stderr)
+
+    Pool = ProcessPoolExecutor if args.pool == "process" else ThreadPoolExecutor
+    failed = 0
+    t0 = time.perf_counter()
+    with open(args.output, "w" if args.restart else "a", encoding="utf-8") as out, Pool(max_workers=args.workers) as pool:
+        futures = {pool.submit(audit_file, p, args.model, args.mode): p for p in todo}
+        for i, fut in enumerate(as_completed(futures), 1):
+            try:
+                rec = fut.result()
+            except Exception as e:
+                rec = {"path": futures[fut], "code_hash": None, "status": 500, "success": False, "error": str(e)}
+            out.write(json.dumps(rec) + "\n")
+            out.flush()
+            failed += not rec.get("success")
+            risk = (rec.get("audit") or {}).get("risk_score", "-")
+            print(f"[Scan] {i}/{len(todo)} {rec['path']}: "
+                  f"{'risk ' + str(risk) if rec.get('success') else 'FAILED ' + str(rec.get('error'))}", file=sys.stderr)
+    print(f"[Scan] Done in {time.perf_counter() - t0:.1f}s, {failed} failed, results in {args.output}", file=sys.stderr)
+    return 1 if failed else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="auditor", description="Headless smart contract auditor")
+    sub = parser.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("scan", help="audit every .sol file under a directory")
+    s.add_argument("root")
+    s.add_argument("-o", "--output", default="audit_results.jsonl")
+    s.add_argument("-w", "--workers", type=int, default=int(os.environ.get("SCAN_WORKERS", 4)))
+    s.add_argument("--pool", choices=("thread", "process"), default="thread")
+    s.add_argument("--model", default="GEMINI_2_5_FLASH")
+    s.add_argument("--mode", choices=("single", "chunked"), default=None)
+    s.add_argument("--restart", action="store_true", help="ignore and overwrite existing results")
+    args = parser.parse_args(argv)
+    return scan(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+Batch auditing helpers.
+Collects sources from a JSON list or an uploaded zip/tarball, dedupes identical
+files by normalized hash, and rolls per-file results up into one summary.
+"""
+import io, os, zipfile, tarfile, hashlib
+from audit_cache import normalize_source
+
+BATCH_MAX_FILES      = int(os.environ.get("BATCH_MAX_FILES", 200))
+BATCH_MAX_FILE_BYTES = int(os.environ.get("BATCH_MAX_FILE_BYTES", 1024 * 1024))
+BATCH_CONCURRENCY    = int(os.environ.get("BATCH_CONCURRENCY", 4))
+
+class BatchError(Exception):
+    pass
+
+def _decode(name, raw):
+    if len(raw) > BATCH_MAX_FILE_BYTES:
+        raise BatchError(f"{name} exceeds {BATCH_MAX_FILE_BYTES} bytes")
+    return raw.decode("utf-8", errors="replace")
+
+def from_archive(filename, blob):
+    """[(name, code)] for every .sol file in a zip or tar(.gz) archive."""
+    out = []
+    buf = io.BytesIO(blob)
+    if zipfile.is_zipfile(buf):
+        with zipfile.ZipFile(buf) as zf:
+            for info in zf.infolist():
+                if not info.is_dir() and info.filename.endswith(".sol"):
+                    if info.file_size > BATCH_MAX_FILE_BYTES:
+                        raise BatchError(f"{info.filename} exceeds {BATCH_MAX_FILE_BYTES} bytes")
+                    out.append((info.filename, _decode(info.filename, zf.read(info))))
+    else:
+        buf.seek(0)
+        try:
+            with tarfile.open(fileobj=buf, mode="r:*") as tf:
+                for member in tf.getmembers():
+                    if member.isfile() and member.name.endswith(".sol"):
+                        if member.size > BATCH_MAX_FILE_BYTES:
+                            raise BatchError(f"{member.name} exceeds {BATCH_MAX_FILE_BYTES} bytes")
+                        out.append((member.name, _decode(member.name, tf.extractfile(member).read())))
+        except tarfile.TarError:
+            raise BatchError(f"{filename or 'upload'} is not a zip or tar archive")
+    return out
+
+def from_json(data):
+    """[(name, code)] from {"files": [{"name", "code"}]} or {"sources": ["..."]}."""
+    out = []
+    for i, f in enumerate(data.get("files") or []):
+        if isinstance(f, dict):
+            out.append((f.get("name") or f"file_{i + 1}.sol", f.get("code") or ""))
+    for i, code in enumerate(data.get("sources") or []):
+        if isinstance(code, str):
+            out.append((f"source_{i + 1}.sol", code))
+    return out
+
+def dedupe(sources):
+    """Group identical sources: [(hash, code, [names])] in first-seen order, empty files dropped."""
+    if len(sources) > BATCH_MAX_FILES:
+        raise BatchError(f"Too many files ({len(sources)} > {BATCH_MAX_FILES})")
+    groups = {}
+    for name, code in sources:
+        code = code.strip()
+        if not code:
+            continue
+        h = hashlib.sha256(normalize_source(code).encode()).hexdigest()[:16]
+        if h in groups:
+            groups[h][2].append(name)
+        else:
+            groups[h] = (h, code, [name])
+    return list(groups.values())
+
+def rollup(results, total_files):
+    """Aggregate severity counts and the maximum risk score across per-file results."""
+    sevs = {"critical": 0, "high": 0, "medium": 0, "low": 0, "info": 0}
+    max_risk, max_file, failed = 0, None, 0
+    for r in results:
+        audit = r.get("audit")
+        if not audit:
+            failed += 1
+            continue
+        weight = len(r["names"])
+        for k, v in (audit.get("severity_counts") or {}).items():
+            sevs[k] = sevs.get(k, 0) + v * weight
+        risk = audit.get("risk_score") or 0
+        if isinstance(risk, (int, float)) and risk >= max_risk:
+            max_risk, max_file = risk, r["names"][0]
+    return {
+        "type": "summary",
+        "files": total_files,
+        "unique": len(results),
+        "failed": failed,
+        "severity_counts": sevs,
+        "max_risk_score": max_risk,
+        "max_risk_file": max_file,
+    }
@@ -0,0 +1,191 @@
+"""
+Benchmark: llm_json.parse vs the previous parse_llm_json (fence split + json.loads +
+repair_json + regex retry). Reports time per call and findings recovered per case, then
+throughput, success rate and salvage rate per parse_corpus category.
+    python bench_parse.py [iterations] [--per-category N] [--seed S] [--json]
+"""
+import re, json, time, argparse
+import llm_json
+import parse_corpus
+
+# ── Previous implementation (app.py before the streaming parser) ──
+
+def legacy_repair_json(s):
+    s = s.strip()
+    if not s:
+        return "{}"
+    in_string = False
+    escape = False
+    stack = []
+    for char in s:
+        if escape:
+            escape = False
+            continue
+        if char == '\\':
+            escape = True
+            continue
+        if char == '"':
+            in_string = not in_string
+            continue
+        if not in_string:
+            if char == '{': stack.append('}')
+            elif char == '[': stack.append(']')
+            elif char == '}':
+                if stack and stack[-1] == '}': stack.pop()
+            elif char == ']':
+                if stack and stack[-1] == ']': stack.pop()
+    if in_string:
+        if s.endswith('\\'): s = s[:-1]
+        s += '"'
+    while stack:
+        s += stack.pop()
+    return s
+
+def legacy_parse(raw):
+    s = raw.strip()
+    if "```json" in s:
+        s = s.split("```json")[1].split("```")[0]
+    elif "```" in s:
+        parts = s.split("```")
+        if len(parts) > 1:
+            s = parts[1]
+            if s.startswith("json"): s = s[4:]
+    s = s.strip()
+    try:
+        return json.loads(s)
+    except:
+        pass
+    try:
+        return json.loads(legacy_repair_json(s))
+    except:
+        pass
+    match = re.search(r'(\{.*)', s, re.DOTALL)
+    if match:
+        try:
+            return json.loads(legacy_repair_json(match.group(1)))
+        except:
+            pass
+    return None
+
+# ── Sample responses ──
+
+def report(n_vulns):
+    return {
+        "summary": "The contract has several issues. No critical vulnerabilities found.",
+        "risk_score": 64,
+        "vulnerabilities": [{
+            "id": f"V-{i:03d}",
+            "title": f"Reentrancy in withdraw{i}",
+            "severity": "high",
+            "description": "External call before state update allows the callee to re-enter "
+                           "and drain funds. \"Checks-Effects-Interactions\" is not followed. " * 3,
+            "line_hint": f"Line {10 + i} (withdraw{i}())",
+            "recommendation": "Update balances before the call or add nonReentrant.",
+            "cwe": "CWE-841",
+        } for i in range(1, n_vulns + 1)],
+        "gas_optimizations": [{"title": "Cache array length", "description": "Loop reads length each time.",
+                               "savings": "~100 gas"}],
+        "best_practices": [{"title": "Reentrancy protection", "status": "fail", "note": "Not applied."}],
+    }
+
+def cases():
+    body = json.dumps(report(8), indent=2)
+    fenced = "```json\n" + body + "\n```"
+    cut = body.index('"title": "Reentrancy in withdraw6"')
+    return {
+        "clean (fenced)": fenced,
+        "clean (prose + fence)": "Here is the audit report:\n" + fenced + "\nLet me know if you need more.",
+        "trailing commas": fenced.replace('"\n    }', '",\n    }'),
+        "truncated mid-finding": "```json\n" + body[:cut + 20],
+        "truncated mid-string": "```json\n" + body[:body.index("drain funds", cut)],
+        "truncated after value": "```json\n" + body[:body.index('"severity": "high"', cut) + 18],
+    }
+
+def count(parsed):
+    if not isinstance(parsed, dict):
+        return "FAIL"
+    vulns = parsed.get("vulnerabilities") or []
+    partial = sum(1 for v in vulns if "recommendation" not in v)
+    return f"{len(vulns)} findings" + (f" ({partial} partial)" if partial else "")
+
+def bench(fn, raw, iterations):
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn(raw)
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+def recovered(parsed):
+    """Complete findings in a parse result."""
+    if not isinstance(parsed, dict):
+        return 0
+    return sum(1 for v in parsed.get("vulnerabilities") or [] if isinstance(v, dict) and "recommendation" in v)
+
+def suite(parsers, per_category, seed, iterations):
+    """Per category and parser: time per call, throughput, success rate and salvage rate.
+    success: a report came out exactly when one should; salvage: complete findings recovered
+    out of those present before any cut."""
+    rows = []
+    for category, samples in parse_corpus.corpus(per_category, seed).items():
+        size = sum(len(s.raw) for s in samples)
+        reps = max(1, iterations // len(samples) // (20 if category == "large" else 1))
+        for name, fn in parsers.items():
+            t0 = time.perf_counter()
+            for _ in range(reps):
+                for s in samples:
+                    fn(s.raw)
+            per_call = (time.perf_counter() - t0) / (reps * len(samples))
+            results = [fn(s.raw) for s in samples]
+            ok = sum(isinstance(r, dict) == s.parseable for r, s in zip(results, samples))
+            expected = sum(s.expected for s in samples)
+            got = sum(min(recovered(r), s.expected) for r, s in zip(results, samples))
+            rows.append({
+                "category": category, "parser": name, "samples": len(samples),
+                "us_per_call": round(per_call * 1e6, 1),
+                "mb_per_s": round(size / len(samples) / per_call / 1e6, 1) if per_call else 0.0,
+                "success": round(ok / len(samples), 3),
+                "salvage": round(got / expected, 3) if expected else None,
+            })
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the LLM response parser")
+    parser.add_argument("iterations", nargs="?", type=int, default=2000)
+    parser.add_argument("--per-category", type=int, default=20, help="corpus samples per category")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the per-category suite as JSON")
+    args = parser.parse_args(argv)
+    iterations = args.iterations
+    parsers = {"legacy": legacy_parse, "new": lambda r: llm_json.parse(r)[0]}
+
+    if args.json:
+        print(json.dumps(suite(parsers, args.per_category, args.seed, iterations), indent=2))
+        return
+
+    print(f"{'case':<24} {'legacy us':>10} {'new us':>10}  {'legacy result':<24} new result")
+    for name, raw in cases().items():
+        t_old = bench(legacy_parse, raw, iterations)
+        t_new = bench(lambda r: llm_json.parse(r), raw, iterations)
+        new, truncated = llm_json.parse(raw)
+        print(f"{name:<24} {t_old:>10.1f} {t_new:>10.1f}  {count(legacy_parse(raw)):<24} "
+              f"{count(new)}{' (truncated)' if truncated else ''}")
+
+    # Streaming: feed the response in 64-character chunks as it would arrive
+    raw = cases()["clean (fenced)"]
+    t0 = time.perf_counter()
+    for _ in range(iterations // 10 or 1):
+        p = llm_json.StreamingJSONParser()
+        for i in range(0, len(raw), 64):
+            p.feed(raw[i:i + 64])
+        p.result()
+    per = (time.perf_counter() - t0) / (iterations // 10 or 1) * 1e6
+    print(f"\nstreaming feed, 64-char chunks ({len(raw)} chars): {per:.1f} us per response")
+
+    print(f"\ncorpus ({args.per_category} per category, seed {args.seed})")
+    print(f"{'category':<22} {'parser':<7} {'us/call':>9} {'MB/s':>7} {'success':>8} {'salvage':>8}")
+    for r in suite(parsers, args.per_category, args.seed, iterations):
+        salvage = "-" if r["salvage"] is None else f"{r['salvage']:.1%}"
+        print(f"{r['category']:<22} {r['parser']:<7} {r['us_per_call']:>9.1f} {r['mb_per_s']:>7.1f} "
+              f"{r['success']:>8.1%} {salvage:>8}")
+
+if __name__ == "__main__":
+    main()
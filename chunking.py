@@ -0,0 +1,161 @@
+"""
+Chunked auditing for large sources.
+Splits a file at contract/function boundaries into token-bounded chunks. Each chunk
+carries the shared context it needs (pragma, imports, state variables, modifiers,
+events, in-file base contracts). Per-chunk reports are merged back into the normal
+report schema.
+"""
+import os, re
+from solidity import SourceMap, CONTEXT_KINDS, CODE_KINDS
+from reports import SEVERITY_ORDER, risk_score, items
+
+CHUNK_MAX_TOKENS  = int(os.environ.get("CHUNK_MAX_TOKENS", 3000))
+CHUNK_AUTO_TOKENS = int(os.environ.get("CHUNK_AUTO_TOKENS", 6000))
+CHUNK_WORKERS     = int(os.environ.get("CHUNK_WORKERS", 8))
+
+MARKER_RE = re.compile(r"^\s*// line (\d+)\s*$")
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for code)."""
+    return max(1, len(text) // 4)
+
+def _context_block(sm, contract):
+    c = sm.contract(contract)
+    members = [u for u in sm.members_of(contract) if u.kind in CONTEXT_KINDS]
+    head = f"{c.kind} {c.name}" + (f" is {', '.join(c.bases)}" if c.bases else "")
+    return head, members
+
+def _render_contract(sm, contract, units):
+    head, ctx = _context_block(sm, contract)
+    c = sm.contract(contract)
+    lines = [f"// line {c.start_line}", head + " {"]
+    for u in ctx + list(units):
+        lines.append(f"    // line {u.start_line}")
+        lines.append("    " + u.text)
+    lines += [f"// line {c.end_line}", "}"]
+    return "\n".join(lines)
+
+def render_header(sm):
+    """Pragma, imports and other file-level lines, each with its line marker."""
+    return "\n".join(f"// line {u.start_line}\n{u.text}" for u in sm.preamble)
+
+def render_selection(sm, header, selection):
+    """selection: ordered {contract: [code units]} -> chunk source text, with a "// line N"
+    marker before every unit (see strip_markers)."""
+    parts = [header] if header else []
+    shown = set()
+    for contract, units in selection.items():
+        # Base contracts defined in this file contribute their state and modifiers
+        for base in sm.lineage(contract)[:-1]:
+            if base not in shown and base not in selection:
+                shown.add(base)
+                parts.append("// context only (audited in its own section)\n" + _render_contract(sm, base, []))
+        shown.add(contract)
+        parts.append(_render_contract(sm, contract, units))
+    return "\n\n".join(parts)
+
+def plan_chunks(code, max_tokens=CHUNK_MAX_TOKENS):
+    """Split code into chunk sources of roughly max_tokens each (a single oversized
+    function still becomes its own chunk). Returns [code] when no split is needed."""
+    if estimate_tokens(code) <= max_tokens:
+        return [code]
+    sm = SourceMap(code)
+    if not sm.contracts:
+        return [code]
+    header = render_header(sm)
+
+    def ctx_cost(contract):
+        return sum(estimate_tokens(u.text) for name in sm.lineage(contract)
+                   for u in sm.members_of(name) if u.kind in CONTEXT_KINDS) + 10
+
+    chunks, selection = [], {}
+    used = estimate_tokens(header)
+    for c in sm.contracts:
+        units = [u for u in sm.members_of(c.name) if u.kind in CODE_KINDS]
+        for u in units or [None]:
+            cost = estimate_tokens(u.text) if u else 0
+            extra = 0 if c.name in selection else ctx_cost(c.name)
+            if selection and used + extra + cost > max_tokens:
+                chunks.append(render_selection(sm, header, selection))
+                selection, used = {}, estimate_tokens(header)
+                extra = ctx_cost(c.name)
+            selection.setdefault(c.name, [])
+            if u:
+                selection[c.name].append(u)
+            used += extra + cost
+    if selection:
+        chunks.append(render_selection(sm, header, selection))
+    return chunks
+
+def strip_markers(text):
+    """Remove the "// line N" markers from rendered text. Returns (text, origin) where origin[i]
+    is the original line number of line i+1, or None for lines no marker covers."""
+    out, origin, line = [], [], None
+    for l in text.split("\n"):
+        m = MARKER_RE.match(l)
+        if m:
+            line = int(m.group(1))
+            continue
+        out.append(l)
+        origin.append(line)
+        if line is not None:
+            line += 1
+    return "\n".join(out), origin
+
+def _key(*parts):
+    return "|".join(str(p or "").strip().lower() for p in parts)
+
+def merge_reports(reports, total_chunks=None):
+    """Merge per-chunk reports: dedupe findings, renumber V-xxx ids, take the max risk score."""
+    vulns, gas, practices = [], [], []
+    seen_v, seen_g, seen_p = set(), set(), set()
+    summaries = []
+    for r in reports:
+        for v in items(r, "vulnerabilities"):
+            k = _key(v.get("title"), v.get("line_hint"))
+            if k not in seen_v:
+                seen_v.add(k)
+                vulns.append(dict(v))
+        for g in items(r, "gas_optimizations"):
+            k = _key(g.get("title"))
+            if k not in seen_g:
+                seen_g.add(k)
+                gas.append(g)
+        for p in items(r, "best_practices"):
+            k = _key(p.get("title"), p.get("status"))
+            if k not in seen_p:
+                seen_p.add(k)
+                practices.append(p)
+        s = str(r.get("summary") or "").strip()
+        if s and s not in summaries:
+            summaries.append(s)
+
+    def rank(v):
+        sev = str(v.get("severity") or "info").lower()
+        return SEVERITY_ORDER.index(sev) if sev in SEVERITY_ORDER else len(SEVERITY_ORDER)
+    vulns.sort(key=rank)
+    for i, v in enumerate(vulns, 1):
+        v["id"] = f"V-{i:03d}"
+
+    total = total_chunks or len(reports)
+    summary = f"Audited in {total} sections. " + " ".join(summaries)
+    if len(reports) < total:
+        summary += f" Note: {total - len(reports)} of {total} sections could not be audited."
+    if not any(str(v.get("severity") or "").lower() == "critical" for v in vulns) and \
+            "no critical vulnerabilities found" not in summary.lower():
+        summary += " No critical vulnerabilities found."
+
+    merged = {
+        "summary": summary.strip(),
+        "risk_score": max((risk_score(r) for r in reports), default=0),
+        "vulnerabilities": vulns,
+        "gas_optimizations": gas,
+        "best_practices": practices,
+        "chunks": {"total": total, "failed": total - len(reports)},
+    }
+    if any(r.get("truncated") for r in reports):
+        merged["truncated"] = True
+    routed = [r["routing"] for r in reports if isinstance(r.get("routing"), dict)]
+    if routed:
+        merged["routing"] = dict(routed[0], sections=len(routed))
+    return merged
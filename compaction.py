@@ -0,0 +1,92 @@
+"""
+Source compaction before inference.
+Strips comments (NatSpec, SPDX headers), blank lines and redundant whitespace, and
+reduces vendored OpenZeppelin contracts to their signatures. A line map from
+compacted to original line numbers lets line_hint values be rewritten afterwards.
+"""
+import os, re
+from solidity import SourceMap, strip_comments, mask, CODE_KINDS
+
+COMPACT_ENABLED  = os.environ.get("COMPACT_SOURCE", "1") != "0"
+COMPACT_VENDORED = os.environ.get("COMPACT_VENDORED", "1") != "0"
+
+# Header line of an OpenZeppelin source file, e.g.
+# "// OpenZeppelin Contracts (last updated v5.0.0) (token/ERC20/ERC20.sol)"
+OZ_HEADER_RE = re.compile(r"^[ \t]*// OpenZeppelin Contracts(?:-upgradeable)?"
+                          r"(?: v[\w.-]+| \(last updated v[\w.-]+\))? \((?:[\w.-]+/)*(\w+)\.sol\)[ \t]*$", re.M)
+LINE_REF_RE  = re.compile(r"\b(lines?|L)(\s*)(\d+)(?:(\s*[-–]\s*)(\d+))?", re.I)
+WS_RE        = re.compile(r"[ \t]+")
+
+def _vendored_spans(code, sm):
+    """(start, end, stub) for contracts preceded by an OpenZeppelin file header naming them
+    (the header path's file name must be the contract name)."""
+    spans = []
+    prev_end = 0
+    for c in sm.contracts:
+        headers = [m.group(1) for m in OZ_HEADER_RE.finditer(code, prev_end, c.start)]
+        if headers and headers[-1] == c.name:
+            sigs = []
+            for u in sm.members_of(c.name):
+                if u.kind in CODE_KINDS:
+                    body = sm.masked.find("{", u.start, u.end)
+                    head = code[u.start:body if body >= 0 else u.end].rstrip(" ;\n")
+                    sigs.append("    " + WS_RE.sub(" ", head.replace("\n", " ")) + ";")
+            head = WS_RE.sub(" ", code[c.start:sm.masked.find("{", c.start)].replace("\n", " ")).strip()
+            stub = "\n".join([f"{head} {{ // vendored OpenZeppelin, bodies omitted"] + sigs + ["}"])
+            spans.append((c.start, c.end, stub))
+        prev_end = c.end
+    return spans
+
+def compact(code):
+    """Return (compacted_code, line_map) where line_map[i] is the original line of compacted line i+1."""
+    stripped = strip_comments(code)
+    masked = mask(code)
+
+    if COMPACT_VENDORED and OZ_HEADER_RE.search(code):
+        # Splice stubs in place (same line count, padded with blank lines) so numbering is preserved
+        sm = SourceMap(code)
+        for start, end, stub in reversed(_vendored_spans(code, sm)):
+            pad = code.count("\n", start, end) - stub.count("\n")
+            if pad < 0:
+                continue
+            repl = stub + "\n" * pad
+            stripped = stripped[:start] + repl + stripped[end:]
+            masked = masked[:start] + repl + masked[end:]
+
+    out, line_map = [], []
+    for i, (line, mline) in enumerate(zip(stripped.split("\n"), masked.split("\n"))):
+        if mline == line:
+            # No string literal on this line, so all whitespace runs are insignificant
+            line = WS_RE.sub(" ", line)
+        line = line.strip()
+        if line:
+            out.append(line)
+            line_map.append(i + 1)
+    return "\n".join(out), line_map
+
+def invert_line_map(line_map, total_lines):
+    """Original -> compacted numbering, in the same list form as line_map. Removed lines map to
+    the next line that was kept."""
+    inv, j = [], 0
+    for n in range(1, total_lines + 1):
+        while j < len(line_map) and line_map[j] < n:
+            j += 1
+        inv.append(min(j, len(line_map) - 1) + 1 if line_map else n)
+    return inv
+
+def remap_line_hints(report, line_map):
+    """Rewrite 'Line N' references in line_hint from compacted to original numbering."""
+    def fix(m):
+        def orig(n):
+            n = int(n)
+            return str(line_map[n - 1]) if 1 <= n <= len(line_map) else str(n)
+        out = m.group(1) + m.group(2) + orig(m.group(3))
+        if m.group(5):
+            out += m.group(4) + orig(m.group(5))
+        return out
+
+    for v in report.get("vulnerabilities") or []:
+        hint = v.get("line_hint") if isinstance(v, dict) else None
+        if isinstance(hint, str):
+            v["line_hint"] = LINE_REF_RE.sub(fix, hint)
+    return report
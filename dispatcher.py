@@ -0,0 +1,194 @@
+"""
+Bounded inference dispatcher.
+Replaces the process-wide llm_lock: each model gets its own concurrency limit,
+waiters are served in arrival order (a saturated model never blocks callers of
+another model), and queue depth / wait time are tracked per model. Threads wait on
+a condition; coroutines queue in the same FIFO on a future (acquire_async), so
+waiting never parks an executor thread.
+"""
+import os, time, asyncio, threading, itertools
+from collections import deque
+
+DEFAULT_LIMIT = int(os.environ.get("LLM_CONCURRENCY", 4))
+MAX_INFLIGHT  = int(os.environ.get("LLM_MAX_INFLIGHT", 16))
+QUEUE_TIMEOUT = float(os.environ.get("LLM_QUEUE_TIMEOUT", 120))
+
+class QueueTimeout(Exception):
+    pass
+
+def _resolve(fut):
+    if not fut.done():
+        fut.set_result(None)
+
+class _ModelStats:
+    __slots__ = ("limit", "in_flight", "queued", "max_queued", "completed",
+                 "wait_total", "wait_max", "timeouts")
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+class InferenceDispatcher:
+    def __init__(self, default_limit=DEFAULT_LIMIT, max_inflight=MAX_INFLIGHT, queue_timeout=QUEUE_TIMEOUT):
+        self.default_limit = default_limit
+        self.max_inflight = max_inflight
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._waiters = deque()
+        self._tickets = itertools.count()
+        self._models = {}
+        self._in_flight = 0
+
+    def limit_for(self, model_name):
+        """LLM_CONCURRENCY_<MODEL> overrides the default limit for one model."""
+        return int(os.environ.get(f"LLM_CONCURRENCY_{model_name}", self.default_limit))
+
+    def _model(self, model_name):
+        m = self._models.get(model_name)
+        if m is None:
+            m = self._models[model_name] = _ModelStats(self.limit_for(model_name))
+        return m
+
+    def _has_capacity(self, model_name):
+        m = self._models[model_name]
+        return m.in_flight < m.limit and self._in_flight < self.max_inflight
+
+    def _can_run(self, ticket, model_name):
+        if not self._has_capacity(model_name):
+            return False
+        # FIFO: yield to any earlier waiter that could run right now, and never
+        # overtake an earlier waiter for the same model.
+        for t, name, _ in self._waiters:
+            if t == ticket:
+                return True
+            if name == model_name or self._has_capacity(name):
+                return False
+        return True
+
+    def acquire(self, model_name):
+        """Block until a slot is free; returns seconds spent queued."""
+        start = time.monotonic()
+        with self._cond:
+            m = self._model(model_name)
+            ticket = next(self._tickets)
+            entry = (ticket, model_name, None)
+            self._waiters.append(entry)
+            m.queued += 1
+            m.max_queued = max(m.max_queued, m.queued)
+            deadline = start + self.queue_timeout
+            timed_out = False
+            while not self._can_run(ticket, model_name):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    m.timeouts += 1
+                    timed_out = True
+                    break
+                self._cond.wait(remaining)
+            else:
+                m.in_flight += 1
+                self._in_flight += 1
+            self._waiters.remove(entry)
+            m.queued -= 1
+            self._cond.notify_all()
+            self._wake()
+            if timed_out:
+                raise QueueTimeout(f"Inference queue timeout for {model_name} after {self.queue_timeout:.0f}s")
+            return self._waited(m, start)
+
+    async def acquire_async(self, model_name):
+        """acquire() for coroutines: queues in the same FIFO and waits on a future instead of
+        blocking a thread. Returns seconds spent queued."""
+        start = time.monotonic()
+        fut = asyncio.get_running_loop().create_future()
+        with self._cond:
+            m = self._model(model_name)
+            entry = (next(self._tickets), model_name, fut)
+            self._waiters.append(entry)
+            m.queued += 1
+            m.max_queued = max(m.max_queued, m.queued)
+            self._wake()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._cond:
+                granted = entry not in self._waiters
+                if not granted:
+                    self._waiters.remove(entry)
+                    m.queued -= 1
+                    if isinstance(e, asyncio.TimeoutError):
+                        m.timeouts += 1
+                    self._cond.notify_all()
+                    self._wake()
+            if granted:
+                self.release(model_name)  # handed over while we were giving up
+            if isinstance(e, asyncio.TimeoutError):
+                raise QueueTimeout(f"Inference queue timeout for {model_name} after {self.queue_timeout:.0f}s") from None
+            raise
+        with self._cond:
+            return self._waited(m, start)
+
+    def _waited(self, m, start):
+        waited = time.monotonic() - start
+        m.wait_total += waited
+        m.wait_max = max(m.wait_max, waited)
+        return waited
+
+    def _wake(self):
+        """Hand free slots to queued coroutines whose turn it is (they cannot re-check the
+        condition themselves). Called with the lock held after any change to slots or queue."""
+        for entry in list(self._waiters):
+            ticket, name, fut = entry
+            if fut is not None and self._can_run(ticket, name):
+                self._waiters.remove(entry)
+                m = self._models[name]
+                m.queued -= 1
+                m.in_flight += 1
+                self._in_flight += 1
+                fut.get_loop().call_soon_threadsafe(_resolve, fut)
+
+    def try_acquire(self, model_name):
+        """Take a slot only if one is free right now and nobody is queued; returns True on success."""
+        with self._cond:
+            m = self._model(model_name)
+            if self._waiters or not self._has_capacity(model_name):
+                return False
+            m.in_flight += 1
+            self._in_flight += 1
+            return True
+
+    def release(self, model_name):
+        with self._cond:
+            m = self._models[model_name]
+            m.in_flight -= 1
+            m.completed += 1
+            self._in_flight -= 1
+            self._cond.notify_all()
+            self._wake()
+
+    def stats(self):
+        with self._cond:
+            models = {}
+            for name, m in self._models.items():
+                started = m.completed + m.in_flight
+                models[name] = {
+                    "limit": m.limit,
+                    "in_flight": m.in_flight,
+                    "queue_depth": m.queued,
+                    "max_queue_depth": m.max_queued,
+                    "completed": m.completed,
+                    "timeouts": m.timeouts,
+                    "avg_wait_ms": round(m.wait_total / started * 1000, 1) if started else 0.0,
+                    "max_wait_ms": round(m.wait_max * 1000, 1),
+                }
+            return {
+                "max_inflight": self.max_inflight,
+                "in_flight": self._in_flight,
+                "queue_depth": len(self._waiters),
+                "models": models,
+            }
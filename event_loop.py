@@ -0,0 +1,69 @@
+"""
+One long-lived asyncio event loop running in a daemon thread.
+Request threads submit coroutines with run_coroutine_threadsafe, so async SDK
+clients (and their keep-alive connections) stay bound to a loop that never dies.
+"""
+import os, asyncio, threading, time
+import concurrent.futures
+
+_loop = None
+_thread = None
+_pid = None
+_lock = threading.Lock()
+_started_at = None
+_submitted = 0
+
+def get_loop():
+    """Return the background loop, starting it on first use (and again after a fork)."""
+    global _loop, _thread, _pid, _started_at
+    if _loop is not None and _pid == os.getpid() and _thread.is_alive():
+        return _loop
+    with _lock:
+        if _loop is not None and _pid == os.getpid() and _thread.is_alive():
+            return _loop
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def _run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        _thread = threading.Thread(target=_run, name="async-loop", daemon=True)
+        _thread.start()
+        ready.wait()
+        _loop, _pid, _started_at = loop, os.getpid(), time.time()
+        print("[Loop] Background event loop started")
+        return _loop
+
+def submit(coro):
+    """Schedule a coroutine on the background loop; returns a concurrent.futures.Future."""
+    global _submitted
+    _submitted += 1
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+def run(coro, timeout=None):
+    """Run a coroutine on the background loop and block the calling thread for its result."""
+    fut = submit(coro)
+    try:
+        return fut.result(timeout)
+    except concurrent.futures.TimeoutError:
+        fut.cancel()
+        raise TimeoutError(f"Async call timed out after {timeout}s")
+
+def _pending(loop):
+    try:
+        return len(asyncio.all_tasks(loop))
+    except RuntimeError:
+        # all_tasks() can race with the loop thread; the count is informational only
+        return None
+
+def stats():
+    loop = _loop
+    return {
+        "running": bool(loop and loop.is_running() and _pid == os.getpid()),
+        "thread": _thread.name if _thread else None,
+        "uptime_s": round(time.time() - _started_at, 1) if _started_at else None,
+        "submitted": _submitted,
+        "pending_tasks": _pending(loop) if loop and loop.is_running() else 0,
+    }
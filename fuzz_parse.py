@@ -0,0 +1,156 @@
+"""
+Property-based fuzzing of the LLM response parser (llm_json), stdlib random only.
+    python fuzz_parse.py [--runs N] [--seed S]
+Properties checked on random JSON documents and their mutations:
+  roundtrip  valid JSON, fenced or wrapped in prose (braces in the prose included), parses to
+             the same object, not truncated
+  prefix     any prefix of a document never raises; what comes back holds only values that
+             were complete before the cut (array elements exactly, object values recursively)
+  stream     feeding a document in random chunk sizes gives the one-shot result
+  mutation   random edits, deletions and garbage never raise
+A failing case is printed with its seed so it can be replayed with --seed.
+"""
+import sys, json, random, argparse
+import llm_json
+import parse_corpus
+
+KEYS = ["summary", "risk_score", "vulnerabilities", "title", "severity", "description", "line_hint",
+        "id", "ok", "nested", "a", "b"]
+TEXT = ["reentrancy", 'quote "x"', "back\\slash", "brace { } [ ]", "colon: comma,", "line\nbreak",
+        "tab\t", "été", "— dash", "emoji \U0001f512", ""]
+
+def gen_value(rng, depth=0):
+    r = rng.random()
+    if depth >= 4 or r < 0.35:
+        return rng.choice([
+            lambda: rng.choice(TEXT) + rng.choice(TEXT),
+            lambda: rng.randint(-10**6, 10**6),
+            lambda: round(rng.uniform(-1000, 1000), rng.randint(0, 6)),
+            lambda: rng.choice([True, False, None]),
+        ])()
+    if r < 0.65:
+        return [gen_value(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return gen_object(rng, depth + 1)
+
+def gen_object(rng, depth=0):
+    return {rng.choice(KEYS) + str(i): gen_value(rng, depth) for i in range(rng.randint(0, 5))}
+
+def gen_document(rng):
+    if rng.random() < 0.3:
+        return parse_corpus.report(rng, rng.randint(0, 5), escapes=rng.random() < 0.5)
+    return gen_object(rng)
+
+def dumps(rng, obj):
+    return json.dumps(obj, indent=rng.choice([None, 1, 2]), ensure_ascii=rng.random() < 0.5,
+                      separators=rng.choice([None, (",", ":")]) if rng.random() < 0.3 else None)
+
+def is_prefix(got, full):
+    """got holds only complete values of full: array elements are equal, object values are
+    equal or (for containers) prefixes themselves."""
+    if isinstance(full, dict):
+        return isinstance(got, dict) and all(k in full and is_prefix(v, full[k]) for k, v in got.items())
+    if isinstance(full, list):
+        return (isinstance(got, list) and len(got) <= len(full)
+                and all(g == f for g, f in zip(got, full)))
+    return got == full
+
+class Failure(Exception):
+    pass
+
+def check(cond, prop, raw, detail=""):
+    if not cond:
+        raise Failure(f"{prop}: {detail}\ninput: {raw[:600]!r}{'...' if len(raw) > 600 else ''}")
+
+def prop_roundtrip(rng, doc):
+    body = dumps(rng, doc)
+    wrap = rng.choice([
+        lambda b: b,
+        lambda b: f"```json\n{b}\n```",
+        lambda b: f"```\n{b}\n```",
+        lambda b: f"{rng.choice(parse_corpus.PROSE)}\n\n{b}\n\n{rng.choice(parse_corpus.TRAILERS)}",
+        lambda b: f"{rng.choice(parse_corpus.PROSE)}\n```json\n{b}\n```\nDone.",
+        lambda b: f"{rng.choice(parse_corpus.BRACE_PROSE)}\n\n{b}",
+    ])
+    raw = wrap(body)
+    obj, truncated = llm_json.parse(raw)
+    check(obj == doc and not truncated, "roundtrip", raw, f"got {obj!r:.200} truncated={truncated}")
+
+def prop_prefix(rng, doc):
+    body = dumps(rng, doc)
+    cut = rng.randint(0, len(body))
+    raw = "```json\n" + body[:cut]
+    try:
+        obj, truncated = llm_json.parse(raw)
+    except Exception as e:
+        check(False, "prefix", raw, f"raised {type(e).__name__}: {e}")
+    if cut == len(body):
+        check(obj == doc, "prefix", raw, "full document did not round-trip")
+    elif obj is not None:
+        check(is_prefix(obj, doc), "prefix", raw, f"invented or altered values: {obj!r:.300}")
+
+def prop_stream(rng, doc):
+    body = dumps(rng, doc)
+    raw = body[:rng.randint(1, len(body))] if rng.random() < 0.5 else body
+    whole = llm_json.StreamingJSONParser()
+    whole.feed(raw)
+    p = llm_json.StreamingJSONParser()
+    i = 0
+    while i < len(raw):
+        step = rng.choice([1, 2, 3, 7, 16, 64, 1000])
+        p.feed(raw[i:i + step])
+        i += step
+    a, b = p.result(), whole.result()
+    check(a == b and p.malformed == whole.malformed, "stream", raw, f"chunked {a!r:.200} vs whole {b!r:.200}")
+
+def mutate(rng, s):
+    s = list(s)
+    for _ in range(rng.randint(1, 6)):
+        op = rng.random()
+        i = rng.randrange(len(s) + 1)
+        if op < 0.3 and s:
+            del s[min(i, len(s) - 1)]
+        elif op < 0.6:
+            s.insert(i, rng.choice('{}[]",:\\ \n\t0123456789-etrufalsn`'))
+        elif op < 0.8 and s:
+            s[min(i, len(s) - 1)] = chr(rng.randrange(0x20, 0x250))
+        else:
+            j = rng.randrange(len(s) + 1)
+            s[i:j] = s[j:i]
+    return "".join(s)
+
+def prop_mutation(rng, doc):
+    raw = mutate(rng, dumps(rng, doc)) if rng.random() < 0.8 else \
+        "".join(chr(rng.randrange(0x20, 0x7f)) for _ in range(rng.randint(0, 200)))
+    try:
+        obj, truncated = llm_json.parse(raw)
+        check(obj is None or isinstance(obj, (dict, list)), "mutation", raw, f"returned {type(obj).__name__}")
+    except Failure:
+        raise
+    except Exception as e:
+        check(False, "mutation", raw, f"raised {type(e).__name__}: {e}")
+
+PROPERTIES = {"roundtrip": prop_roundtrip, "prefix": prop_prefix, "stream": prop_stream, "mutation": prop_mutation}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fuzz the LLM response parser")
+    parser.add_argument("--runs", type=int, default=2000, help="cases per property")
+    parser.add_argument("--seed", type=int, default=None, help="replay a single case")
+    args = parser.parse_args(argv)
+
+    seeds = [args.seed] if args.seed is not None else range(args.runs)
+    failures = 0
+    for name, prop in PROPERTIES.items():
+        for seed in seeds:
+            rng = random.Random(f"{name}:{seed}")
+            try:
+                prop(rng, gen_document(rng))
+            except Failure as e:
+                failures += 1
+                print(f"[Fuzz] FAIL seed={seed} {e}\n")
+                break  # one counterexample per property is enough
+        else:
+            print(f"[Fuzz] {name:<10} {len(seeds)} cases ok")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Hedged inference requests.
+If the primary model has not answered within a percentile of its recent latency,
+the same request is sent to a backup model; the first valid response wins and the
+other call is cancelled. Disabled unless HEDGE=1.
+"""
+import os, time, asyncio, threading
+from collections import deque
+
+HEDGE_ENABLED       = os.environ.get("HEDGE", "0") == "1"
+HEDGE_BACKUP        = os.environ.get("HEDGE_BACKUP", "")      # MODEL_SPECS key; empty = the model's fallback
+HEDGE_PERCENTILE    = float(os.environ.get("HEDGE_PERCENTILE", 95))
+HEDGE_MIN_DELAY     = float(os.environ.get("HEDGE_MIN_DELAY", 2.0))
+HEDGE_DEFAULT_DELAY = float(os.environ.get("HEDGE_DEFAULT_DELAY", 20.0))
+HEDGE_MIN_SAMPLES   = int(os.environ.get("HEDGE_MIN_SAMPLES", 20))
+HEDGE_WINDOW        = int(os.environ.get("HEDGE_WINDOW", 200))
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(round(pct / 100 * (len(s) - 1))))]
+
+class Hedger:
+    def __init__(self, pct=HEDGE_PERCENTILE, min_delay=HEDGE_MIN_DELAY, default_delay=HEDGE_DEFAULT_DELAY,
+                 min_samples=HEDGE_MIN_SAMPLES, window=HEDGE_WINDOW):
+        self.pct = pct
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.window = window
+        self._lock = threading.Lock()
+        self._latency = {}
+        self.requests = 0
+        self.hedged = 0
+        self.no_slot = 0
+        self.wins = {"primary": 0, "backup": 0}
+
+    def record(self, model_name, seconds):
+        """Latency of a successful call, used to derive the hedge delay."""
+        with self._lock:
+            self._latency.setdefault(model_name, deque(maxlen=self.window)).append(seconds)
+
+    def _delay(self, model_name):
+        samples = self._latency.get(model_name, ())
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        return max(self.min_delay, percentile(samples, self.pct))
+
+    def delay_for(self, model_name):
+        with self._lock:
+            return self._delay(model_name)
+
+    async def run(self, primary, backup, start, validate, timeout):
+        """Coroutine. await start(model_name, blocking) -> asyncio Task, or None if no slot was free
+        (never for blocking=True). validate(result) -> True if usable. Returns (result, winner_name, info)."""
+        delay = self.delay_for(primary)
+        deadline = time.monotonic() + timeout
+        futures = {}
+        try:
+            futures[await start(primary, True)] = primary
+            with self._lock:
+                self.requests += 1
+            done, _ = await asyncio.wait(futures, timeout=delay)
+            hedged = False
+            if not done and backup:
+                fut = await start(backup, False)
+                if fut is None:
+                    with self._lock:
+                        self.no_slot += 1
+                else:
+                    futures[fut] = backup
+                    hedged = True
+                    with self._lock:
+                        self.hedged += 1
+                    print(f"[Hedge] {primary} slower than {delay:.1f}s, hedging with {backup}")
+
+            result, winner, error, fallback = None, None, None, None
+            pending = set(futures)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, timeout=max(0, deadline - time.monotonic()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for fut in done:
+                    try:
+                        value = fut.result()
+                    except Exception as e:
+                        error = e
+                        continue
+                    if validate(value):
+                        result, winner = value, futures[fut]
+                        break
+                    if fallback is None:
+                        fallback = (value, futures[fut])
+        finally:
+            # Also on cancellation (retry budget or caller timeout): no paid call or slot outlives run()
+            for fut in futures:
+                if not fut.done():
+                    fut.cancel()
+
+        if winner is None:
+            if fallback is not None:
+                result, winner = fallback
+            elif error is not None:
+                raise error
+            else:
+                raise TimeoutError(f"Async call timed out after {timeout}s")
+        if hedged:
+            with self._lock:
+                self.wins["primary" if winner == primary else "backup"] += 1
+        return result, winner, {"hedged": hedged, "primary": primary, "backup": backup if hedged else None,
+                                "winner": winner, "delay_ms": round(delay * 1000, 1),
+                                "hedge_rate": self.stats()["hedge_rate"]}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": HEDGE_ENABLED,
+                "percentile": self.pct,
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "hedge_rate": round(self.hedged / self.requests, 3) if self.requests else 0.0,
+                "no_backup_slot": self.no_slot,
+                "wins": dict(self.wins),
+                "delay_ms": {m: round(self._delay(m) * 1000, 1) for m in self._latency},
+            }
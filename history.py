@@ -0,0 +1,102 @@
+"""
+Persistent audit history.
+One SQLite table in WAL mode, shared by every worker process on the host and kept
+across restarts, indexed on code_hash, timestamp and model. Pages are read with an
+id cursor, so memory use does not grow with the number of audits.
+"""
+import os, json, sqlite3, threading, tempfile, itertools
+from collections import deque
+
+HISTORY_DB       = os.environ.get("HISTORY_DB") or os.path.join(tempfile.gettempdir(), "auditor_history.sqlite3")
+HISTORY_MAX_ROWS = int(os.environ.get("HISTORY_MAX_ROWS", 100000))
+HISTORY_PAGE_MAX = int(os.environ.get("HISTORY_PAGE_MAX", 100))
+PRUNE_EVERY      = 500   # inserts between retention sweeps
+
+COLUMNS = ("audit_id", "code_hash", "model", "timestamp", "risk_score", "summary", "severity_counts", "cache")
+
+class HistoryStore:
+    def __init__(self, path=HISTORY_DB, max_rows=HISTORY_MAX_ROWS):
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._db = None
+        self._inserts = 0
+        self._fallback = deque(maxlen=200)  # used only if the database cannot be opened
+        self._fallback_ids = itertools.count(1)
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS audit_history ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, audit_id TEXT NOT NULL, code_hash TEXT NOT NULL,"
+                " model TEXT, timestamp INTEGER NOT NULL, risk_score INTEGER, summary TEXT,"
+                " severity_counts TEXT, cache TEXT)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_history_hash ON audit_history(code_hash, id)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_history_model ON audit_history(model, id)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_history_ts ON audit_history(timestamp)")
+            self._db.commit()
+        except Exception as e:
+            print(f"[History] Store disabled, keeping the last {self._fallback.maxlen} in memory: {e}")
+            self._db = None
+
+    def add(self, entry):
+        row = [entry.get(c) for c in COLUMNS]
+        row[COLUMNS.index("severity_counts")] = json.dumps(entry.get("severity_counts") or {})
+        with self._lock:
+            if self._db is None:
+                self._fallback.append(dict(entry, id=next(self._fallback_ids)))
+                return
+            try:
+                self._db.execute(f"INSERT INTO audit_history ({', '.join(COLUMNS)}) VALUES "
+                                 f"({', '.join('?' * len(COLUMNS))})", row)
+                self._inserts += 1
+                if self._inserts % PRUNE_EVERY == 0:
+                    self._db.execute("DELETE FROM audit_history WHERE id <= "
+                                     "(SELECT MAX(id) FROM audit_history) - ?", (self.max_rows,))
+                self._db.commit()
+            except Exception as e:
+                print(f"[History] Write error: {e}")
+
+    def page(self, limit=20, cursor=None, code_hash=None, model=None, since=None, until=None, min_risk=None):
+        """Newest first. Returns (entries, next_cursor); next_cursor is None on the last page."""
+        limit = max(1, min(int(limit), HISTORY_PAGE_MAX))
+        cursor = int(cursor) if cursor not in (None, "") else None
+        where, args = [], []
+        for clause, value in (("id < ?", cursor), ("code_hash = ?", code_hash), ("model = ?", model),
+                              ("timestamp >= ?", since), ("timestamp <= ?", until), ("risk_score >= ?", min_risk)):
+            if value not in (None, ""):
+                where.append(clause)
+                args.append(value)
+        with self._lock:
+            if self._db is None:
+                rows = [e for e in reversed(self._fallback) if self._matches(e, cursor, code_hash, model,
+                                                                             since, until, min_risk)]
+                entries = rows[:limit + 1]
+            else:
+                sql = (f"SELECT id, {', '.join(COLUMNS)} FROM audit_history"
+                       + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY id DESC LIMIT ?")
+                entries = []
+                for r in self._db.execute(sql, args + [limit + 1]).fetchall():
+                    e = dict(zip(("id",) + COLUMNS, r))
+                    e["severity_counts"] = json.loads(e["severity_counts"] or "{}")
+                    entries.append(e)
+        more = len(entries) > limit
+        entries = entries[:limit]
+        return entries, (str(entries[-1]["id"]) if more else None)
+
+    @staticmethod
+    def _matches(e, cursor, code_hash, model, since, until, min_risk):
+        return ((cursor is None or e["id"] < cursor) and (not code_hash or e.get("code_hash") == code_hash)
+                and (not model or e.get("model") == model) and (since is None or e["timestamp"] >= since)
+                and (until is None or e["timestamp"] <= until)
+                and (min_risk is None or (e.get("risk_score") or 0) >= min_risk))
+
+    def total(self):
+        """Audits recorded so far (ids are never reused, so this survives pruning)."""
+        with self._lock:
+            if self._db is None:
+                return self._fallback[-1]["id"] if self._fallback else 0
+            try:
+                return self._db.execute("SELECT COALESCE(MAX(id), 0) FROM audit_history").fetchone()[0]
+            except Exception:
+                return 0
@@ -0,0 +1,209 @@
+"""
+Incremental re-audit.
+Every audited source is snapshotted as per-unit fingerprints (functions, modifiers,
+state variables, events, ...) plus the findings attributed to each unit. A later
+audit of an edited file only sends the changed units and their direct dependencies
+to the LLM; findings for unchanged units are carried over.
+"""
+import os, re, json, time, sqlite3, threading, hashlib, tempfile
+from solidity import SourceMap, CODE_KINDS
+from chunking import render_selection, render_header
+from reports import SEVERITY_SCORE, risk_score, items
+
+INCREMENTAL_DB      = os.environ.get("INCREMENTAL_DB") or os.environ.get("AUDIT_CACHE_DB") \
+                      or os.path.join(tempfile.gettempdir(), "auditor_cache.sqlite3")
+MAX_CHANGED_RATIO   = float(os.environ.get("INCREMENTAL_MAX_CHANGED", 0.6))
+SNAPSHOT_TTL        = int(os.environ.get("INCREMENTAL_TTL", 30 * 24 * 3600))
+
+LINE_RE  = re.compile(r"\b(?:lines?|L)\s*(\d+)", re.I)
+WS_RE    = re.compile(r"\s+")
+CALL_RE  = re.compile(r"\b([A-Za-z_]\w*)\s*\(")
+IDENT_RE = re.compile(r"\b[A-Za-z_]\w*\b")
+
+
+def _units(sm):
+    """{key: Unit} with overloads disambiguated as name#2, name#3..."""
+    units, seen = {}, {}
+    for u in sm.members:
+        base = f"{u.contract}.{u.kind}:{u.name}"
+        seen[base] = seen.get(base, 0) + 1
+        units[base if seen[base] == 1 else f"{base}#{seen[base]}"] = u
+    return units
+
+def _fp(sm, u):
+    return hashlib.sha256(WS_RE.sub(" ", sm.masked[u.start:u.end]).strip().encode()).hexdigest()[:16]
+
+def _owner(v, units):
+    """Key of the code unit a finding belongs to, by line number or by function name."""
+    m = LINE_RE.search(str(v.get("line_hint", "")))
+    if m:
+        line = int(m.group(1))
+        for key, u in units.items():
+            if u.kind in CODE_KINDS | {"modifier"} and u.start_line <= line <= u.end_line:
+                return key
+    text = f"{v.get('line_hint', '')} {v.get('title', '')}"
+    for key, u in units.items():
+        if u.kind in CODE_KINDS | {"modifier"} and u.kind != "constructor" and re.search(rf"\b{re.escape(u.name)}\b", text):
+            return key
+    return None
+
+def snapshot(code, report):
+    """Per-unit fingerprints and attributed findings for a finished report."""
+    sm = SourceMap(code)
+    units = _units(sm)
+    findings, unattributed = {}, []
+    for v in items(report, "vulnerabilities"):
+        key = _owner(v, units)
+        if key:
+            findings.setdefault(key, []).append(v)
+        else:
+            unattributed.append(v)
+    return {
+        "units": {k: {"fp": _fp(sm, u), "line": u.start_line} for k, u in units.items()},
+        "findings": findings,
+        "unattributed": unattributed,
+        "risk_score": report.get("risk_score", 0),
+        "gas_optimizations": items(report, "gas_optimizations"),
+        "best_practices": items(report, "best_practices"),
+    }
+
+def _shift_lines(v, delta):
+    if not delta:
+        return dict(v)
+    v = dict(v)
+    v["line_hint"] = LINE_RE.sub(lambda m: m.group(0)[:-len(m.group(1))] + str(int(m.group(1)) + delta),
+                                 str(v.get("line_hint", "")))
+    return v
+
+def plan(code, snap):
+    """Decide what to re-audit. Returns None when a full audit is the better option, else a dict with
+    source (partial code, or None if nothing changed), reaudit (unit keys) and carried (findings)."""
+    sm = SourceMap(code)
+    units = _units(sm)
+    old = snap["units"]
+    changed = {k for k, u in units.items() if k not in old or old[k]["fp"] != _fp(sm, u)}
+    if not units or len(changed) > MAX_CHANGED_RATIO * len(units):
+        return None
+
+    code_keys = {k for k, u in units.items() if u.kind in CODE_KINDS or u.kind == "modifier"}
+    reaudit = {k for k in changed if k in code_keys}
+    # Units whose declarations changed (state, events, modifiers) pull in the code that uses them
+    changed_names = {units[k].name for k in changed}
+    for k in code_keys - reaudit:
+        u = units[k]
+        if changed_names & set(IDENT_RE.findall(sm.masked[u.start:u.end])):
+            reaudit.add(k)
+
+    carried = []
+    for k, u in units.items():
+        if k in reaudit or k not in old:
+            continue
+        for v in snap["findings"].get(k, []):
+            carried.append(_shift_lines(v, u.start_line - old[k]["line"]))
+    carried += [dict(v) for v in snap.get("unattributed", [])]
+
+    if not reaudit:
+        return {"source": None, "reaudit": [], "deps": [], "carried": carried, "changed": sorted(changed)}
+
+    # Direct dependencies: callees and modifiers referenced by re-audited units, shown as context
+    by_name = {}
+    for k in code_keys:
+        by_name.setdefault(units[k].name, []).append(k)
+    deps = set()
+    for k in reaudit:
+        u = units[k]
+        for name in CALL_RE.findall(sm.masked[u.start:u.end]) + IDENT_RE.findall(sm.masked[u.start:u.end]):
+            for dk in by_name.get(name, []):
+                if dk not in reaudit and units[dk].contract in sm.lineage(u.contract):
+                    deps.add(dk)
+
+    selection = {}
+    for k, u in units.items():
+        if k in reaudit or k in deps:
+            selection.setdefault(u.contract, []).append(u)
+    header = render_header(sm)
+    note = ("// Incremental re-audit. Audit ONLY these changed units: "
+            + ", ".join(f"{units[k].contract}.{units[k].name}" for k in sorted(reaudit))
+            + ".\n// Other functions shown are unchanged dependencies, included as context only.")
+    return {
+        "source": note + "\n" + render_selection(sm, header, selection),
+        "reaudit": sorted(reaudit),
+        "deps": sorted(deps),
+        "carried": carried,
+        "changed": sorted(changed),
+    }
+
+def combine(code, plan_result, snap, new_report):
+    """Merge carried findings with findings for re-audited units from the partial report."""
+    sm = SourceMap(code)
+    units = _units(sm)
+    reaudit = set(plan_result["reaudit"])
+    vulns = list(plan_result["carried"])
+    seen = {(str(v.get("title", "")).lower(), str(v.get("line_hint", "")).lower()) for v in vulns}
+    for v in items(new_report or {}, "vulnerabilities"):
+        owner = _owner(v, units)
+        if owner is not None and owner not in reaudit:
+            continue  # finding on an unchanged dependency: the carried result stands
+        k = (str(v.get("title", "")).lower(), str(v.get("line_hint", "")).lower())
+        if k not in seen:
+            seen.add(k)
+            vulns.append(dict(v))
+    for i, v in enumerate(vulns, 1):
+        v["id"] = f"V-{i:03d}"
+
+    score = risk_score(new_report or {})
+    for v in plan_result["carried"]:
+        score = max(score, SEVERITY_SCORE.get(str(v.get("severity", "")).lower(), 0))
+    summary = (new_report or {}).get("summary") or "No changes requiring re-audit."
+    if not any(str(v.get("severity", "")).lower() == "critical" for v in vulns) \
+            and "no critical vulnerabilities found" not in summary.lower():
+        summary += " No critical vulnerabilities found."
+    return {
+        "summary": summary,
+        "risk_score": score,
+        "vulnerabilities": vulns,
+        "gas_optimizations": items(new_report or {}, "gas_optimizations") or snap.get("gas_optimizations", []),
+        "best_practices": items(new_report or {}, "best_practices") or snap.get("best_practices", []),
+    }
+
+class SnapshotStore:
+    def __init__(self, path=INCREMENTAL_DB, ttl=SNAPSHOT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = None
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS audit_snapshots ("
+                " audit_id TEXT PRIMARY KEY, code_hash TEXT NOT NULL, model TEXT,"
+                " created REAL NOT NULL, snapshot TEXT NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_hash ON audit_snapshots(code_hash, created)")
+            self._db.commit()
+        except Exception as e:
+            print(f"[Incremental] Snapshot store disabled: {e}")
+            self._db = None
+
+    def save(self, audit_id, code_hash, model, snap):
+        if self._db is None:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                self._db.execute("INSERT OR REPLACE INTO audit_snapshots VALUES (?, ?, ?, ?, ?)",
+                                 (audit_id, code_hash, model, now, json.dumps(snap)))
+                self._db.execute("DELETE FROM audit_snapshots WHERE created < ?", (now - self.ttl,))
+                self._db.commit()
+            except Exception as e:
+                print(f"[Incremental] Snapshot save error: {e}")
+
+    def load(self, ref):
+        """Snapshot by audit_id, or the latest one for a code_hash."""
+        if self._db is None or not ref:
+            return None
+        with self._lock:
+            row = self._db.execute("SELECT snapshot FROM audit_snapshots WHERE audit_id = ?", (ref,)).fetchone()
+            if row is None:
+                row = self._db.execute(
+                    "SELECT snapshot FROM audit_snapshots WHERE code_hash = ? ORDER BY created DESC LIMIT 1",
+                    (ref,)).fetchone()
+        return json.loads(row[0]) if row else None
@@ -0,0 +1,169 @@
+"""
+Asynchronous audit jobs.
+POST /api/audit?async=1 enqueues the audit on a bounded worker pool and returns
+a job id at once; clients poll GET /api/audit/<id> or listen on the SSE stream.
+Job state is written through to a SQLite table (WAL, like the history store) so
+any worker process on the host can answer for a job another worker is running;
+waiters in the owning process are woken directly, others poll the table.
+"""
+import os, json, time, uuid, sqlite3, tempfile, threading
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS   = int(os.environ.get("AUDIT_JOB_WORKERS", 4))
+JOB_QUEUE_MAX = int(os.environ.get("AUDIT_JOB_QUEUE", 64))
+JOB_TTL       = int(os.environ.get("AUDIT_JOB_TTL", 3600))
+JOB_DB        = os.environ.get("AUDIT_JOB_DB") or os.path.join(tempfile.gettempdir(), "auditor_jobs.sqlite3")
+JOB_POLL      = float(os.environ.get("AUDIT_JOB_POLL", 0.5))  # seconds between polls for other workers' jobs
+
+FIELDS = ("job_id", "status", "created", "started", "finished", "http_status", "result", "version")
+
+class QueueFull(Exception):
+    pass
+
+class JobManager:
+    def __init__(self, workers=JOB_WORKERS, queue_max=JOB_QUEUE_MAX, ttl=JOB_TTL, path=JOB_DB):
+        self.queue_max = queue_max
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="audit-job")
+        self._jobs = {}   # jobs owned by this process
+        self._cond = threading.Condition()
+        self._db = None
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS audit_jobs ("
+                " job_id TEXT PRIMARY KEY, status TEXT NOT NULL, created REAL NOT NULL, started REAL,"
+                " finished REAL, http_status INTEGER, result TEXT, version INTEGER NOT NULL, updated REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_updated ON audit_jobs(updated)")
+            self._db.commit()
+        except Exception as e:
+            print(f"[Jobs] Shared store disabled, job ids are only known to this worker: {e}")
+            self._db = None
+
+    @property
+    def shared(self):
+        return self._db is not None
+
+    def submit(self, fn, *args):
+        """Queue fn(*args) -> (body, http_status); returns the job id."""
+        with self._cond:
+            self._expire()
+            active = sum(1 for j in self._jobs.values() if j["status"] in ("queued", "running"))
+            if active >= self.queue_max:
+                raise QueueFull(f"Audit queue is full ({active} jobs pending)")
+            job_id = uuid.uuid4().hex
+            job = self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "created": time.time(),
+                "started": None,
+                "finished": None,
+                "http_status": None,
+                "result": None,
+                "version": 0,
+            }
+            self._store(job)
+        self._pool.submit(self._run, job_id, fn, args)
+        return job_id
+
+    def _run(self, job_id, fn, args):
+        self._update(job_id, status="running", started=time.time())
+        try:
+            body, status = fn(*args)
+            ok = status < 400 and body.get("success", True)
+            self._update(job_id, status="done" if ok else "error", result=body,
+                         http_status=status, finished=time.time())
+        except Exception as e:
+            print(f"[Jobs] {job_id} crashed: {e}")
+            self._update(job_id, status="error", result={"success": False, "error": str(e)},
+                         http_status=500, finished=time.time())
+
+    def _update(self, job_id, **fields):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.update(fields)
+            job["version"] += 1
+            self._store(job)
+            self._cond.notify_all()
+
+    def _store(self, job):
+        """Write a job through to the shared table (caller holds the lock)."""
+        if self._db is None:
+            return
+        row = [job[f] for f in FIELDS]
+        row[FIELDS.index("result")] = json.dumps(job["result"]) if job["result"] is not None else None
+        try:
+            self._db.execute(f"INSERT OR REPLACE INTO audit_jobs ({', '.join(FIELDS)}, updated) VALUES "
+                             f"({', '.join('?' * len(FIELDS))}, ?)", row + [time.time()])
+            self._db.commit()
+        except Exception as e:
+            print(f"[Jobs] Write error: {e}")
+
+    def _load(self, job_id):
+        """A job owned by another worker, from the shared table."""
+        if self._db is None:
+            return None
+        with self._cond:
+            try:
+                row = self._db.execute(f"SELECT {', '.join(FIELDS)} FROM audit_jobs WHERE job_id = ? AND updated >= ?",
+                                       (job_id, time.time() - self.ttl)).fetchone()
+            except Exception as e:
+                print(f"[Jobs] Read error: {e}")
+                return None
+        if row is None:
+            return None
+        job = dict(zip(FIELDS, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for jid in [j for j, v in self._jobs.items() if v["finished"] and v["finished"] < cutoff]:
+            del self._jobs[jid]
+        if self._db is not None:
+            try:
+                self._db.execute("DELETE FROM audit_jobs WHERE updated < ?", (cutoff,))
+                self._db.commit()
+            except Exception as e:
+                print(f"[Jobs] Expiry error: {e}")
+
+    def get(self, job_id):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job:
+                return dict(job)
+        return self._load(job_id)
+
+    def wait(self, job_id, after_version, timeout):
+        """Block until the job changes past `after_version` (or timeout); returns a snapshot."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if job_id in self._jobs:
+                while True:
+                    job = self._jobs.get(job_id)
+                    if job is None or job["version"] > after_version:
+                        return dict(job) if job else None
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return dict(job)
+                    self._cond.wait(remaining)
+        # Another worker runs it: poll the shared table
+        while True:
+            job = self._load(job_id)
+            if job is None or job["version"] > after_version:
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            time.sleep(min(JOB_POLL, remaining))
+
+    def stats(self):
+        with self._cond:
+            counts = {}
+            for j in self._jobs.values():
+                counts[j["status"]] = counts.get(j["status"], 0) + 1
+            return {"queue_max": self.queue_max, "shared": self.shared, "jobs": counts}
@@ -0,0 +1,194 @@
+"""
+Tolerant JSON parsing for LLM output.
+Well-formed responses are decoded in one C pass from the first object start (code
+fences, leading and trailing prose are skipped without splitting). Anything else goes through an
+incremental single-pass parser that accepts trailing commas and raw newlines in
+strings, decodes complete nested values in C, and on truncation keeps every complete
+value seen before the cut: a half-written vulnerability is dropped, the ones before
+it survive.
+"""
+import re, json, itertools
+
+STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"', re.S)
+SKIP_RE   = re.compile(r'[\s,:]*')
+NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?')
+TOKEN_RE  = re.compile(r'[\w.+-]*')  # extent of a bare number or literal
+LITERALS  = {"true": True, "false": False, "null": None}
+OBJECT_RE = re.compile(r'\{\s*["}]')  # '{' opening a key or an empty object
+CLOSER_RE = re.compile(r'[}\]]')
+MAX_STARTS = 8
+
+_decoder = json.JSONDecoder(strict=False)
+
+class StreamingJSONParser:
+    """Feed text chunks as they arrive; result() returns the object parsed so far.
+    Consumed input is never rescanned; a token split across chunks waits for the next feed."""
+    __slots__ = ("buf", "pos", "stack", "root", "started", "malformed")
+
+    def __init__(self):
+        self.buf = ""
+        self.pos = 0
+        self.stack = []      # [container, pending_key] frames
+        self.root = None     # set once the outermost object closes
+        self.started = False
+        self.malformed = False  # mismatched bracket or stray character: not just cut short
+
+    @property
+    def complete(self):
+        return self.root is not None
+
+    def feed(self, chunk):
+        if self.root is not None:
+            return
+        self.buf += chunk
+        self._run()
+        if self.pos:
+            self.buf, self.pos = self.buf[self.pos:], 0
+
+    def _attach(self, value):
+        if not self.stack:
+            self.root = value
+            return
+        frame = self.stack[-1]
+        container = frame[0]
+        if isinstance(container, list):
+            container.append(value)
+        elif frame[1] is None:
+            if isinstance(value, str):
+                frame[1] = value  # object key
+        else:
+            container[frame[1]] = value
+            frame[1] = None
+
+    def _run(self):
+        buf, n = self.buf, len(self.buf)
+        pos = self.pos
+        if not self.started:
+            start = buf.find("{", pos)
+            if start < 0:
+                self.pos = n
+                return
+            self.started = True
+            pos = start
+        while self.root is None:
+            pos = SKIP_RE.match(buf, pos).end()
+            if pos >= n:
+                break
+            c = buf[pos]
+            if c == "{" or c == "[":
+                try:
+                    # Complete subtrees (most findings) decode in C; only the cut one is walked by hand
+                    value, pos = _decoder.raw_decode(buf, pos)
+                    self._attach(value)
+                    continue
+                except ValueError:
+                    pass
+                self.stack.append([{} if c == "{" else [], None])
+                pos += 1
+            elif c == "}" or c == "]":
+                pos += 1
+                if self.stack:
+                    container = self.stack.pop()[0]
+                    if isinstance(container, dict) != (c == "}"):
+                        self.malformed = True
+                    self._attach(container)
+            elif c == '"':
+                m = STRING_RE.match(buf, pos)
+                if not m:
+                    break  # unterminated string: wait for more input
+                body = m.group(1)
+                if "\\" in body:
+                    try:
+                        body = _decoder.decode('"' + body + '"')
+                    except ValueError:
+                        pass
+                self._attach(body)
+                pos = m.end()
+            else:
+                if TOKEN_RE.match(buf, pos).end() == n:
+                    # A number or literal running to the end of the input may continue in the
+                    # next chunk, or was cut off; either way it is not a complete value yet
+                    break
+                m = NUMBER_RE.match(buf, pos)
+                if m:
+                    text = m.group(0)
+                    self._attach(float(text) if any(ch in text for ch in ".eE") else int(text))
+                    pos = m.end()
+                    continue
+                word = buf[pos:pos + 5]
+                for lit, value in LITERALS.items():
+                    if word.startswith(lit):
+                        self._attach(value)
+                        pos += len(lit)
+                        break
+                else:
+                    self.malformed = True
+                    pos += 1  # stray character: skip it
+        self.pos = pos
+
+    def result(self):
+        """Parsed object, or a salvaged one if input ended early (None if nothing usable).
+        Unfinished containers are kept only as values of an object key; an unfinished
+        element of an array is dropped, as is a key whose value never arrived."""
+        if self.root is not None:
+            return self.root
+        self._run()
+        if self.root is not None:
+            return self.root
+        if not self.stack:
+            return None
+        child = None
+        for frame in reversed(self.stack):
+            container, key = frame
+            if child is not None and isinstance(container, dict) and key is not None:
+                container[key] = child
+            child = container
+        return child or None
+
+def _starts(raw):
+    """Candidate object starts, lazily: a '{' opening a key or an empty object, after the first
+    code fence if there is one. Falls back to the first '{' when nothing looks like an object."""
+    fence = raw.find("```")
+    begin = fence + 3 if fence >= 0 else 0
+    found = False
+    for m in OBJECT_RE.finditer(raw, begin if fence < 0 or OBJECT_RE.search(raw, begin) else 0):
+        found = True
+        yield m.start()
+    if not found:
+        start = raw.find("{", begin)
+        if start < 0 and fence >= 0:
+            start = raw.find("{")
+        if start >= 0:
+            yield start
+
+def _attempt(raw, start):
+    """(obj, truncated, malformed, end) for the object starting at raw[start]."""
+    try:
+        obj, end = _decoder.raw_decode(raw, start)
+        return obj, False, False, end
+    except ValueError:
+        pass
+    p = StreamingJSONParser()
+    p.feed(raw[start:])
+    obj = p.result()
+    return obj, obj is not None and not p.complete, p.malformed, len(raw) - len(p.buf)
+
+def parse(raw):
+    """Return (obj, truncated). obj is None when no JSON object could be recovered, or when
+    the text is malformed rather than cut short (that is left to a repair prompt).
+    A brace in a prose preamble ("The struct `Order { uint id; }` ...") does not hide the
+    report after it: a malformed attempt is retried from the next candidate start, but only
+    a complete object that nothing closes after (so not a finding nested in a broken report)
+    is accepted from a retry."""
+    empty = None
+    for i, start in enumerate(itertools.islice(_starts(raw), MAX_STARTS)):
+        obj, truncated, malformed, end = _attempt(raw, start)
+        if malformed:
+            continue
+        if i and (truncated or CLOSER_RE.search(raw, end)):
+            continue
+        if obj == {}:
+            empty = empty or (obj, truncated)
+            continue  # may be "{}" in the preamble (an empty Solidity block): prefer a later object
+        return obj, truncated
+    return empty or (None, False)
@@ -0,0 +1,108 @@
+"""
+Pool of long-lived og.LLM clients.
+Clients are created once and checked out per call, so gateway/TEE discovery and
+the HTTP connection pool are reused across requests. A client is recycled when
+it gets too old or keeps failing.
+"""
+import os, time, threading
+from collections import deque
+from contextlib import contextmanager
+
+MAX_AGE        = float(os.environ.get("LLM_CLIENT_MAX_AGE", 900))
+MAX_ERRORS     = int(os.environ.get("LLM_CLIENT_MAX_ERRORS", 2))
+MAX_IDLE       = int(os.environ.get("LLM_CLIENT_MAX_IDLE", 8))
+
+class _Pooled:
+    __slots__ = ("client", "created", "uses", "errors")
+
+    def __init__(self, client):
+        self.client = client
+        self.created = time.monotonic()
+        self.uses = 0
+        self.errors = 0
+
+class LLMPool:
+    def __init__(self, factory, max_age=MAX_AGE, max_errors=MAX_ERRORS, max_idle=MAX_IDLE):
+        self.factory = factory
+        self.max_age = max_age
+        self.max_errors = max_errors
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+        self.init_failures = 0
+        self.init_ms_total = 0.0
+        self.init_ms_last = None
+        self.checkout_ms_total = 0.0
+        self.checkouts = 0
+
+    def _healthy(self, p):
+        return p.errors < self.max_errors and time.monotonic() - p.created < self.max_age
+
+    def checkout(self, key="default"):
+        """Return a pooled client for `key`, creating one if none is idle (None if init fails)."""
+        start = time.perf_counter()
+        p = None
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            while idle:
+                cand = idle.pop()
+                if self._healthy(cand):
+                    p = cand
+                    self.reused += 1
+                    break
+                self.recycled += 1
+        if p is None:
+            t0 = time.perf_counter()
+            client = self.factory()
+            init_ms = (time.perf_counter() - t0) * 1000
+            with self._lock:
+                if client is None:
+                    self.init_failures += 1
+                    return None
+                self.created += 1
+                self.init_ms_total += init_ms
+                self.init_ms_last = round(init_ms, 1)
+            p = _Pooled(client)
+        p.uses += 1
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_ms_total += (time.perf_counter() - start) * 1000
+        return p
+
+    def checkin(self, key, p, ok=True):
+        if p is None:
+            return
+        p.errors = 0 if ok else p.errors + 1
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            if self._healthy(p) and len(idle) < self.max_idle:
+                idle.append(p)
+            else:
+                self.recycled += 1
+
+    @contextmanager
+    def client(self, key="default"):
+        p = self.checkout(key)
+        ok = False
+        try:
+            yield p.client if p else None
+            ok = True
+        finally:
+            self.checkin(key, p, ok)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "recycled": self.recycled,
+                "init_failures": self.init_failures,
+                "idle": {k: len(v) for k, v in self._idle.items()},
+                "init_ms_avg": round(self.init_ms_total / self.created, 1) if self.created else None,
+                "init_ms_last": self.init_ms_last,
+                "checkout_ms_avg": round(self.checkout_ms_total / self.checkouts, 3) if self.checkouts else None,
+                "max_age": self.max_age,
+            }
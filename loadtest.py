@@ -0,0 +1,142 @@
+"""
+Load generator for /api/audit.
+Drives the endpoint at a fixed concurrency and reports throughput, status and cache
+breakdown, and latency percentiles. Pair it with the local LLM stand-in to measure
+concurrency, retry and caching changes without touching the gateway:
+
+    OG_MOCK=1 MOCK_LATENCY=lognormal:1.5,0.4 MOCK_TRUNCATE_RATE=0.1 python app.py
+    python loadtest.py -c 16 -n 400 --unique 0.5
+"""
+import sys, json, time, random, argparse, threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from hedging import percentile
+
+CONTRACT = """// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.{minor};
+
+contract Vault{n} {{
+    mapping(address => uint256) public balances;
+    uint256 public fee = {fee};
+
+    function deposit() external payable {{
+        balances[msg.sender] += msg.value;
+    }}
+
+    function withdraw(uint256 amount) external {{
+        require(balances[msg.sender] >= amount, "insufficient");
+        (bool ok, ) = msg.sender.call{{value: amount - fee}}("");
+        require(ok);
+        balances[msg.sender] -= amount;
+    }}
+}}
+"""
+
+def make_contract(n):
+    return CONTRACT.format(n=n, minor=n % 20 + 1, fee=n % 97)
+
+class Run:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.status = {}
+        self.cache = {}
+        self.errors = {}
+
+    def record(self, seconds, status, cache=None, error=None):
+        with self._lock:
+            self.latencies.append(seconds)
+            self.status[status] = self.status.get(status, 0) + 1
+            if cache:
+                self.cache[cache] = self.cache.get(cache, 0) + 1
+            if error:
+                self.errors[error] = self.errors.get(error, 0) + 1
+
+def one(client, url, body, run):
+    t0 = time.perf_counter()
+    try:
+        r = client.post(url, json=body)
+        data = r.json() if r.headers.get("content-type", "").startswith("application/json") else {}
+        audit = data.get("audit") or {}
+        run.record(time.perf_counter() - t0, r.status_code, audit.get("cache"),
+                   None if r.status_code == 200 else str(data.get("error", r.text))[:80])
+    except Exception as e:
+        run.record(time.perf_counter() - t0, "exception", error=f"{type(e).__name__}: {e}"[:80])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test /api/audit")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("-n", "--requests", type=int, default=100)
+    parser.add_argument("-d", "--duration", type=float, default=None,
+                        help="run for this many seconds instead of a fixed request count")
+    parser.add_argument("--unique", type=float, default=1.0,
+                        help="fraction of requests with a never-seen contract (the rest repeat a small set)")
+    parser.add_argument("--hot-set", type=int, default=10, help="number of repeated contracts")
+    parser.add_argument("--model", default="GEMINI_2_5_FLASH")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    salt = rng.randrange(10**6, 10**7)  # fresh contracts per run so the server cache starts cold
+    counter = iter(range(10**9))
+    counter_lock = threading.Lock()
+    stop_at = time.monotonic() + args.duration if args.duration else None
+    url = args.url.rstrip("/") + "/api/audit"
+    run = Run()
+
+    def next_body():
+        with counter_lock:
+            i = next(counter)
+            if stop_at is None and i >= args.requests:
+                return None
+            unique = rng.random() < args.unique
+            n = salt * 1000 + i if unique else rng.randrange(args.hot_set)
+        return {"code": make_contract(n), "model": args.model}
+
+    def worker():
+        with httpx.Client(timeout=args.timeout) as client:
+            while stop_at is None or time.monotonic() < stop_at:
+                body = next_body()
+                if body is None:
+                    return
+                one(client, url, body, run)
+
+    print(f"[Load] {url}: concurrency {args.concurrency}, "
+          f"{f'{args.duration:g}s' if args.duration else f'{args.requests} requests'}, unique {args.unique:g}",
+          file=sys.stderr)
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for _ in range(args.concurrency):
+            pool.submit(worker)
+    elapsed = time.perf_counter() - t0
+
+    lat = run.latencies
+    ok = run.status.get(200, 0)
+    summary = {
+        "requests": len(lat),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(lat) / elapsed, 2) if elapsed else 0.0,
+        "success_rate": round(ok / len(lat), 3) if lat else 0.0,
+        "latency_ms": {k: round((percentile(lat, p) or 0) * 1000, 1)
+                       for k, p in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))},
+        "status": {str(k): v for k, v in run.status.items()},
+        "cache": run.cache,
+        "errors": dict(sorted(run.errors.items(), key=lambda kv: -kv[1])[:5]),
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"requests    {summary['requests']} in {summary['elapsed_s']}s "
+          f"({summary['throughput_rps']} req/s), success {summary['success_rate']:.1%}")
+    print("latency ms  " + "  ".join(f"{k} {v}" for k, v in summary["latency_ms"].items()))
+    print(f"status      {summary['status']}")
+    print(f"cache       {summary['cache']}")
+    for err, n in summary["errors"].items():
+        print(f"error x{n}  {err}")
+
+if __name__ == "__main__":
+    main()
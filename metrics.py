@@ -0,0 +1,129 @@
+"""
+In-process metrics in Prometheus text format.
+Counters, gauges and fixed-bucket histograms with label values; an observation is
+a dict lookup, a bisect and an add under a lock. render() produces the text served
+on /api/metrics.
+"""
+import time, bisect, threading
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+SIZE_BUCKETS    = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+_registry = []
+
+def _escape(v):
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names, values, extra=""):
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _num(v):
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def mirror(self, value, *labels):
+        """Export a count kept elsewhere (e.g. cache statistics)."""
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_labels(self.labelnames, k)} {_num(v)}" for k, v in items]
+
+class Gauge(Counter):
+    kind = "gauge"
+    set = Counter.mirror
+
+    def replace(self, values):
+        """Set every series at once ({label tuple: value}); series not listed are dropped."""
+        with self._lock:
+            self._values = dict(values)
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            h = self._values.get(labels)
+            if h is None:
+                h = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            h[0][i] += 1
+            h[1] += value
+            h[2] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, *labels)
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, (list(h[0]), h[1], h[2])) for k, h in self._values.items())
+        out = self._header()
+        for k, (counts, total, n) in items:
+            cum = 0
+            for bound, c in zip(self.buckets + ("+Inf",), counts):
+                cum += c
+                le = 'le="%s"' % bound
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, k, le)} {cum}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, k)} {_num(total)}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, k)} {n}")
+        return out
+
+def render():
+    lines = []
+    for m in _registry:
+        lines += m.render()
+    return "\n".join(lines) + "\n"
+
+# ── Auditor metrics ──
+
+phase_seconds = Histogram("auditor_phase_seconds", "Audit pipeline phase latency.", ("phase", "model"))
+inference_seconds = Histogram("auditor_inference_seconds", "Single LLM call latency (excluding queue wait).",
+                              ("model", "call"))
+queue_wait_seconds = Histogram("auditor_queue_wait_seconds", "Time spent waiting for an inference slot.", ("model",))
+parse_seconds = Histogram("auditor_parse_seconds", "LLM response JSON parse time.", (),
+                          buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05))
+parse_results = Counter("auditor_parse_results_total", "LLM response parse outcomes.", ("result",))
+retries = Counter("auditor_retries_total", "First-pass retries by kind.", ("kind",))
+retry_aborts = Counter("auditor_retry_aborts_total", "Requests that stopped retrying.", ("reason",))
+audits = Counter("auditor_audits_total", "Finished audits.", ("status", "cache"))
+input_bytes = Histogram("auditor_input_bytes", "Submitted source size.", (), buckets=SIZE_BUCKETS)
+output_bytes = Histogram("auditor_output_bytes", "LLM response size.", ("model",), buckets=SIZE_BUCKETS)
+in_flight = Gauge("auditor_inference_in_flight", "LLM calls currently running.", ("model",))
+queue_depth = Gauge("auditor_inference_queue_depth", "Requests waiting for an inference slot.", ("model",))
+cache_hits = Counter("auditor_cache_hits_total", "Audit cache hits.", ("tier",))
+cache_misses = Counter("auditor_cache_misses_total", "Audit cache misses.")
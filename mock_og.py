@@ -0,0 +1,173 @@
+"""
+Local stand-in for the subset of the opengradient SDK the auditor uses
+(TEE_LLM, x402SettlementMode, LLM(private_key).chat). No network, no OPG spent.
+Enabled in app.py with OG_MOCK=1; behaviour is set through MOCK_* variables:
+
+  MOCK_LATENCY        fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA | exp:MEAN  (default lognormal:2,0.5)
+  MOCK_ERROR_RATE     fraction of calls failing with a 5xx           (default 0)
+  MOCK_402_RATE       fraction of calls failing with 402             (default 0)
+  MOCK_TIMEOUT_RATE   fraction of calls raising TimeoutError         (default 0)
+  MOCK_TRUNCATE_RATE  fraction of replies cut off mid-JSON           (default 0)
+  MOCK_FENCE_RATE     fraction of replies wrapped in ```json fences  (default 0)
+  MOCK_PROSE_RATE     fraction of replies with a prose preamble      (default 0)
+  MOCK_SEED           seed for the fault / latency draws
+
+Any setting can be overridden per model by suffixing the model name,
+e.g. MOCK_LATENCY_GPT_5=lognormal:12,0.4 or MOCK_ERROR_RATE_GEMINI_2_5_FLASH=1.
+"""
+import os, re, enum, json, random, asyncio, hashlib, threading
+from types import SimpleNamespace
+
+_rng = random.Random(os.environ.get("MOCK_SEED"))
+_lock = threading.Lock()
+_counts = {"calls": 0, "errors": 0, "payment": 0, "timeouts": 0, "truncated": 0, "fenced": 0, "prose": 0}
+
+class TEE_LLM(str, enum.Enum):
+    GEMINI_1_5_FLASH      = "google/gemini-1.5-flash"
+    GEMINI_2_5_FLASH      = "google/gemini-2.5-flash"
+    GEMINI_2_5_FLASH_LITE = "google/gemini-2.5-flash-lite"
+    GEMINI_2_5_PRO        = "google/gemini-2.5-pro"
+    GEMINI_3_FLASH        = "google/gemini-3-flash"
+    GPT_4_1_2025_04_14    = "openai/gpt-4.1-2025-04-14"
+    GPT_5                 = "openai/gpt-5"
+    GPT_5_MINI            = "openai/gpt-5-mini"
+    O4_MINI               = "openai/o4-mini"
+    CLAUDE_HAIKU_4_5      = "anthropic/claude-haiku-4-5"
+    CLAUDE_SONNET_4_5     = "anthropic/claude-sonnet-4-5"
+    CLAUDE_SONNET_4_6     = "anthropic/claude-sonnet-4-6"
+    GROK_4_FAST           = "x-ai/grok-4-fast"
+
+class x402SettlementMode(str, enum.Enum):
+    SETTLE = "settle"
+    SETTLE_METADATA = "settle-metadata"
+    BATCH_HASHED = "settle-batch"
+
+def _setting(name, model, default):
+    return os.environ.get(f"{name}_{model}", os.environ.get(name, default))
+
+def _rate(name, model):
+    return float(_setting(name, model, 0))
+
+def _latency(model):
+    """Draw a call latency (seconds) from the model's configured distribution."""
+    kind, _, args = _setting("MOCK_LATENCY", model, "lognormal:2,0.5").partition(":")
+    a = [float(x) for x in args.split(",") if x]
+    with _lock:
+        if kind == "fixed":
+            return a[0]
+        if kind == "uniform":
+            return _rng.uniform(a[0], a[1])
+        if kind == "exp":
+            return _rng.expovariate(1 / a[0])
+        if kind == "lognormal":
+            return _rng.lognormvariate(0, a[1]) * a[0]
+    raise ValueError(f"Unknown MOCK_LATENCY distribution: {kind}")
+
+def _chance(rate):
+    if rate <= 0:
+        return False
+    with _lock:
+        return _rng.random() < rate
+
+def _count(key):
+    with _lock:
+        _counts[key] += 1
+
+# (title, severity, description, recommendation)
+_CATALOGUE = [
+    ("Reentrancy in withdraw", "high", "CWE-841", "External call is made before the balance is updated.",
+     "Apply checks-effects-interactions or a reentrancy guard."),
+    ("Unchecked low-level call", "medium", "CWE-252", "The return value of call() is ignored.",
+     "Check the returned success flag and revert on failure."),
+    ("Missing access control", "critical", "CWE-284", "A privileged function can be called by any account.",
+     "Restrict the function with onlyOwner or a role check."),
+    ("tx.origin authentication", "medium", "CWE-477", "Authorization relies on tx.origin.",
+     "Use msg.sender instead."),
+    ("Timestamp dependence", "low", "CWE-829", "Logic depends on block.timestamp, which validators can skew slightly.",
+     "Avoid using block.timestamp for critical decisions."),
+    ("Floating pragma", "info", "CWE-1104", "The pragma allows a range of compiler versions.",
+     "Pin the compiler version."),
+]
+_GAS = [
+    ("Cache storage reads", "A state variable is read from storage several times in one call.", "medium"),
+    ("Use custom errors", "Revert strings cost more deployment and runtime gas than custom errors.", "low"),
+]
+_PRACTICES = [
+    ("Events for state changes", "Emit events when balances or ownership change."),
+    ("Checks-effects-interactions", "State is updated before external calls."),
+]
+_WEIGHT = {"critical": 40, "high": 25, "medium": 10, "low": 3, "info": 0}
+FUNCTION_RE = re.compile(r"^\s*function\s+(\w+)\s*\(")
+
+def _report(messages):
+    """Deterministic audit report for a prompt, in the AUDIT_SYSTEM_PROMPT schema: the same
+    input always yields the same findings, pinned to lines and functions of the submitted code."""
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    rng = random.Random(hashlib.sha256(prompt.encode()).digest())
+    # The user message is "<instruction>\n\n<code>...": number lines from the start of the code
+    code = str(messages[-1].get("content", "")).split("\n\n", 1)[-1] if messages else ""
+    lines = [(i, m.group(1)) for i, m in enumerate(map(FUNCTION_RE.match, code.split("\n")), 1) if m]
+    vulns = []
+    for n, (t, sev, cwe, d, r) in enumerate(rng.sample(_CATALOGUE, rng.randint(0, 3)), 1):
+        line, fn = rng.choice(lines) if lines else (rng.randint(1, 80), "withdraw")
+        vulns.append({"id": f"V-{n:03d}", "title": t, "severity": sev, "description": d,
+                      "line_hint": f"Line {line} ({fn}())", "recommendation": r, "cwe": cwe})
+    summary = f"Mock audit found {len(vulns)} issue(s)."
+    if not any(v["severity"] == "critical" for v in vulns):
+        summary += " No critical vulnerabilities found."
+    return {
+        "summary": summary,
+        "risk_score": min(100, 5 + sum(_WEIGHT[v["severity"]] for v in vulns)) if vulns else 0,
+        "vulnerabilities": vulns,
+        "gas_optimizations": [{"title": t, "description": d, "estimated_savings": e}
+                              for t, d, e in _GAS if rng.random() < 0.5],
+        "best_practices": [{"title": t, "status": rng.choice(["pass", "fail", "safe"]), "note": note}
+                           for t, note in _PRACTICES],
+    }
+
+def _shape(text, model):
+    """Apply the configured output faults (truncation, fences, prose preamble)."""
+    finish = "stop"
+    if _chance(_rate("MOCK_TRUNCATE_RATE", model)):
+        _count("truncated")
+        with _lock:
+            text = text[:int(len(text) * _rng.uniform(0.3, 0.9))]
+        finish = "length"
+    if _chance(_rate("MOCK_FENCE_RATE", model)):
+        _count("fenced")
+        text = f"```json\n{text}\n```"
+    if _chance(_rate("MOCK_PROSE_RATE", model)):
+        _count("prose")
+        text = "Here is the security audit of the contract:\n\n" + text
+    return text, finish
+
+class LLM:
+    """Drop-in for og.LLM: async chat() returning an object with chat_output and payment_hash."""
+
+    def __init__(self, private_key=None, **kwargs):
+        self.private_key = private_key
+
+    async def chat(self, model, messages, max_tokens=1000, temperature=0.0, x402_settlement_mode=None, **kwargs):
+        name = getattr(model, "name", None) or str(model)
+        _count("calls")
+        delay = _latency(name)
+        if _chance(_rate("MOCK_TIMEOUT_RATE", name)):
+            _count("timeouts")
+            await asyncio.sleep(delay)
+            raise TimeoutError(f"mock gateway timed out ({name})")
+        if _chance(_rate("MOCK_402_RATE", name)):
+            _count("payment")
+            raise RuntimeError("402 Payment Required: insufficient OPG balance for x402 settlement")
+        await asyncio.sleep(delay)
+        if _chance(_rate("MOCK_ERROR_RATE", name)):
+            _count("errors")
+            raise RuntimeError(f"502 Bad Gateway: mock upstream error ({name})")
+        text, finish = _shape(json.dumps(_report(messages), indent=2), name)
+        with _lock:
+            phash = "0x" + "%064x" % _rng.getrandbits(256)
+        return SimpleNamespace(chat_output={"role": "assistant", "content": text},
+                               finish_reason=finish, payment_hash=phash)
+
+def stats():
+    with _lock:
+        return dict(_counts)
@@ -0,0 +1,158 @@
+"""
+Corpus of realistic LLM audit responses for benchmarking and fuzzing the response
+parser. Each sample carries the findings a correct parser should recover, so speed
+and salvage rate can both be measured per category.
+    corpus(per_category=20, seed=0) -> {category: [Sample, ...]}
+"""
+import json, random
+from collections import namedtuple
+
+# raw: model output; expected: findings recoverable from it; parseable: a report should come out
+Sample = namedtuple("Sample", "raw expected parseable")
+
+TITLES = ["Reentrancy in withdraw", "Unchecked low-level call", "Missing access control on mint",
+          "tx.origin used for authorization", "Integer truncation in fee math", "Front-running in claim",
+          "Unbounded loop over holders", "Oracle price can be manipulated"]
+SEVERITIES = ["critical", "high", "medium", "low", "informational"]
+PROSE = ["Here is the security audit report:", "Sure! Below is my analysis of the contract.",
+         "I have reviewed the contract carefully. Findings follow.", "Audit complete."]
+BRACE_PROSE = ["The struct `Order { uint id; }` is fine.", "I checked mapping(address => uint) {balances}.",
+               "Function f() { ... } has issues:", "The empty `receive() external payable {}` is fine.",
+               'Config {"strict": true, broken} was ignored.']
+TRAILERS = ["Let me know if you need more detail.", "Note: line numbers are approximate.", ""]
+SNIPPETS = ['require(msg.sender == owner, "not owner");', '(bool ok, ) = to.call{value: amt}("");',
+            'emit Transfer(from, to, "\\u00e9t\\u00e9");', 'string s = "a \\"quoted\\" path\\\\to";']
+
+def finding(rng, i, escapes=False):
+    desc = (f"{rng.choice(TITLES)} lets an attacker bypass the intended flow; "
+            f"state is updated after the external call in function f{i}(). ") * rng.randint(1, 4)
+    if escapes:
+        desc += f' Offending code: {rng.choice(SNIPPETS)} and the "quoted" path C:\\contracts\\V{i}.sol \u2014 tab\there.'
+    return {
+        "id": f"V-{i:03d}",
+        "title": rng.choice(TITLES),
+        "severity": rng.choice(SEVERITIES),
+        "description": desc,
+        "line_hint": f"Line {rng.randint(1, 400)}",
+        "recommendation": "Follow checks-effects-interactions and add a reentrancy guard.",
+    }
+
+def report(rng, n, escapes=False):
+    return {
+        "summary": f"The contract has {n} issue(s) worth fixing before deployment.",
+        "risk_score": rng.randint(0, 100),
+        "vulnerabilities": [finding(rng, i, escapes) for i in range(1, n + 1)],
+        "gas_optimizations": [{"title": "Cache storage reads", "savings": "~200 gas"}],
+        "best_practices": [{"title": "Use custom errors", "status": "fail"}],
+    }
+
+def dumps(rng, obj):
+    return json.dumps(obj, indent=rng.choice([None, 2, 4]), ensure_ascii=rng.random() < 0.5)
+
+def complete_before(body, report_obj, cut):
+    """Findings whose closing brace lies before `cut` in body."""
+    n, pos = 0, 0
+    for v in report_obj["vulnerabilities"]:
+        pos = body.index(v["recommendation"], body.index(v["id"], pos))
+        end = body.index("}", pos)
+        if end >= cut:
+            break
+        n, pos = n + 1, end
+    return n
+
+def _cut_mid_string(rng, body, rep):
+    """Cut inside the description of a random finding."""
+    v = rng.choice(rep["vulnerabilities"])
+    start = body.index('"description"', body.index(v["id"])) + 20
+    return start + rng.randint(0, 40)
+
+def _cut_mid_finding(rng, body, rep):
+    """Cut between two keys of a random finding, outside any string."""
+    v = rng.choice(rep["vulnerabilities"])
+    return body.index('"line_hint"', body.index(v["id"])) - 1
+
+def _wrap_fence(rng, body):
+    return f"```{rng.choice(['json', 'JSON', ''])}\n{body}\n```"
+
+def _clean(rng):
+    rep = report(rng, rng.randint(0, 8))
+    return Sample(dumps(rng, rep), len(rep["vulnerabilities"]), True)
+
+def _fenced(rng):
+    rep = report(rng, rng.randint(0, 8))
+    return Sample(_wrap_fence(rng, dumps(rng, rep)), len(rep["vulnerabilities"]), True)
+
+def _prose(rng):
+    rep = report(rng, rng.randint(1, 8))
+    body = dumps(rng, rep)
+    if rng.random() < 0.5:
+        body = _wrap_fence(rng, body)
+    return Sample(f"{rng.choice(PROSE)}\n\n{body}\n\n{rng.choice(TRAILERS)}", len(rep["vulnerabilities"]), True)
+
+def _prose_braces(rng):
+    """Preamble that itself contains braces, e.g. quoted Solidity."""
+    rep = report(rng, rng.randint(1, 8))
+    pre = rng.choice(BRACE_PROSE)
+    return Sample(f"{pre}\n\n{dumps(rng, rep)}", len(rep["vulnerabilities"]), True)
+
+def _truncated_mid_string(rng):
+    rep = report(rng, rng.randint(2, 8))
+    body = json.dumps(rep, indent=2)
+    cut = _cut_mid_string(rng, body, rep)
+    return Sample("```json\n" + body[:cut], complete_before(body, rep, cut), True)
+
+def _truncated_mid_finding(rng):
+    rep = report(rng, rng.randint(2, 8))
+    body = json.dumps(rep, indent=2)
+    cut = _cut_mid_finding(rng, body, rep)
+    return Sample("```json\n" + body[:cut], complete_before(body, rep, cut), True)
+
+def _escaped_quotes(rng):
+    rep = report(rng, rng.randint(1, 6), escapes=True)
+    return Sample(_wrap_fence(rng, dumps(rng, rep)), len(rep["vulnerabilities"]), True)
+
+def _trailing_commas(rng):
+    rep = report(rng, rng.randint(1, 6))
+    body = json.dumps(rep, indent=2).replace('"\n    }', '",\n    }').replace("}\n  ]", "},\n  ]")
+    return Sample(_wrap_fence(rng, body), len(rep["vulnerabilities"]), True)
+
+def _raw_newlines(rng):
+    """Literal newlines inside strings (invalid JSON that models emit)."""
+    rep = report(rng, rng.randint(1, 6))
+    body = json.dumps(rep, indent=2).replace("; state is", ";\nstate is")
+    return Sample(_wrap_fence(rng, body), len(rep["vulnerabilities"]), True)
+
+def _large(rng):
+    rep = report(rng, rng.randint(150, 300), escapes=True)
+    body = json.dumps(rep, indent=2)
+    if rng.random() < 0.5:
+        return Sample(_wrap_fence(rng, body), len(rep["vulnerabilities"]), True)
+    cut = _cut_mid_string(rng, body, rep)
+    return Sample("```json\n" + body[:cut], complete_before(body, rep, cut), True)
+
+def _no_json(rng):
+    text = rng.choice(["I'm sorry, I can't help with that.", "```\nno findings\n```", "", "{", "null"])
+    return Sample(text, 0, False)
+
+CATEGORIES = {
+    "clean": _clean,
+    "fenced": _fenced,
+    "prose": _prose,
+    "prose_braces": _prose_braces,
+    "truncated_mid_string": _truncated_mid_string,
+    "truncated_mid_finding": _truncated_mid_finding,
+    "escaped_quotes": _escaped_quotes,
+    "trailing_commas": _trailing_commas,
+    "raw_newlines": _raw_newlines,
+    "large": _large,
+    "no_json": _no_json,
+}
+
+def corpus(per_category=20, seed=0, categories=None):
+    out = {}
+    for name, make in CATEGORIES.items():
+        if categories and name not in categories:
+            continue
+        rng = random.Random(f"{seed}:{name}")
+        out[name] = [make(rng) for _ in range(max(1, per_category // 10) if name == "large" else per_category)]
+    return out
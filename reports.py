@@ -0,0 +1,27 @@
+"""
+Shared helpers for the audit report schema (see AUDIT_SYSTEM_PROMPT): severity order
+and score bands, and tolerant readers for the fields models most often get wrong.
+"""
+
+SEVERITY_ORDER = ["critical", "high", "medium", "low", "info"]
+# Floor for the risk score implied by a finding's severity (bands from REVIEW_SYSTEM_PROMPT)
+SEVERITY_SCORE = {"critical": 76, "high": 51, "medium": 26, "low": 1, "info": 0}
+
+def risk_score(report):
+    """risk_score as an int; 0 when missing or not a number."""
+    try:
+        return int(report.get("risk_score") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+def items(report, key):
+    """List field of a report with only usable entries: dicts as they are, bare strings as
+    {"title": s}; anything else (numbers, nulls, nested lists) is dropped."""
+    raw = report.get(key)
+    out = []
+    for x in raw if isinstance(raw, list) else []:
+        if isinstance(x, dict):
+            out.append(x)
+        elif isinstance(x, str) and x.strip():
+            out.append({"title": x.strip()})
+    return out
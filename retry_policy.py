@@ -0,0 +1,81 @@
+"""
+Retry policy for inference calls.
+Failures are classified: payment (402), auth and invalid-request errors are not
+retried; timeouts and transient errors are retried with exponential backoff and
+full jitter; an unparsable reply is retried with a short repair prompt carrying
+the broken output instead of resending the contract. Every request has an overall
+time budget covering calls and backoff.
+"""
+import os, time, random, threading
+
+RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", 3))
+RETRY_BASE_DELAY   = float(os.environ.get("RETRY_BASE_DELAY", 1.0))
+RETRY_MAX_DELAY    = float(os.environ.get("RETRY_MAX_DELAY", 8.0))
+RETRY_BUDGET       = float(os.environ.get("RETRY_BUDGET", 180))
+
+RETRYABLE, NON_RETRYABLE, PARSE = "retryable", "non_retryable", "parse"
+NON_RETRYABLE_CLASSES = {"payment", "auth", "invalid"}
+
+REPAIR_SYSTEM_PROMPT = """You repair malformed JSON produced by a smart contract auditor.
+Return the same report as valid JSON ONLY. No markdown, no code fences, no extra text.
+Do not add, remove or reword findings; only fix the syntax."""
+
+def kind_of(error_class):
+    """Retry kind for a router error class (or "parse")."""
+    if error_class == "parse":
+        return PARSE
+    return NON_RETRYABLE if error_class in NON_RETRYABLE_CLASSES else RETRYABLE
+
+def backoff(attempt, base=RETRY_BASE_DELAY, cap=RETRY_MAX_DELAY):
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+def repair_messages(raw):
+    return [
+        {"role": "system", "content": REPAIR_SYSTEM_PROMPT},
+        {"role": "user", "content": str(raw)},
+    ]
+
+class Budget:
+    """Attempts and wall-clock time left for one request."""
+    __slots__ = ("deadline", "attempts", "max_attempts")
+
+    def __init__(self, seconds=RETRY_BUDGET, max_attempts=RETRY_MAX_ATTEMPTS):
+        self.deadline = time.monotonic() + seconds
+        self.attempts = 0
+        self.max_attempts = max_attempts
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def next_delay(self, kind):
+        """Backoff before the next attempt (none before a repair), or None if attempts or time run out."""
+        if self.attempts >= self.max_attempts:
+            return None
+        delay = 0.0 if kind == PARSE else backoff(self.attempts)
+        return delay if delay < self.remaining() else None
+
+class RetryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = {RETRYABLE: 0, PARSE: 0}
+        self.aborted = {NON_RETRYABLE: 0, "budget": 0}
+
+    def record(self, retries=(), aborted=None):
+        with self._lock:
+            self.requests += 1
+            for kind in retries:
+                self.retries[kind] = self.retries.get(kind, 0) + 1
+            if aborted:
+                self.aborted[aborted] = self.aborted.get(aborted, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_attempts": RETRY_MAX_ATTEMPTS,
+                "budget_s": RETRY_BUDGET,
+                "requests": self.requests,
+                "retries": dict(self.retries),
+                "aborted": dict(self.aborted),
+            }
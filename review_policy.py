@@ -0,0 +1,88 @@
+"""
+Adaptive second-pass review.
+The review prompt only corrects specific things: overflow findings under >=0.8,
+reentrancy where CEI holds, severity of serious findings, require(success) and gas
+items filed as vulnerabilities. A first pass with nothing of that kind is returned
+as is; otherwise only the findings those rules apply to are sent for review.
+REVIEW_POLICY=full restores the unconditional review, off disables it.
+"""
+import os, re
+from reports import SEVERITY_SCORE, risk_score, items
+from solidity import pragma_version
+
+REVIEW_POLICY = os.environ.get("REVIEW_POLICY", "adaptive").lower()
+REVIEW_MODEL  = os.environ.get("REVIEW_MODEL", "")  # MODEL_SPECS key; empty = same model as the audit
+
+OVERFLOW_RE   = re.compile(r"overflow|underflow|safemath", re.I)
+REENTRANCY_RE = re.compile(r"reentran", re.I)
+MISFILED_RE   = re.compile(r"\bgas\b|require\s*\(\s*success|redundant", re.I)
+SERIOUS       = ("critical", "high")
+
+def config_tag():
+    """Identifies the review configuration (part of the cache key)."""
+    return f"{REVIEW_POLICY}:{REVIEW_MODEL}"
+
+def _needs_review(v, checked):
+    text = f"{v.get('title', '')} {v.get('description', '')} {v.get('recommendation', '')}"
+    if str(v.get("severity", "")).lower() in SERIOUS or v.get("source") == "static":
+        return True  # static findings are pattern matches: the review confirms or drops them
+    if REENTRANCY_RE.search(text) or v.get("cwe") == "CWE-841" or MISFILED_RE.search(text):
+        return True
+    return checked and (OVERFLOW_RE.search(text) is not None or v.get("cwe") in ("CWE-190", "CWE-191"))
+
+def decide(report, code):
+    """Return (policy, indices, reason): policy is "off", "skip", "subset" or "full";
+    indices are the vulnerabilities (as listed by reports.items) to send for review."""
+    vulns = items(report, "vulnerabilities")
+    if REVIEW_POLICY == "off":
+        return "off", [], "review disabled (REVIEW_POLICY=off)"
+    if REVIEW_POLICY == "full":
+        return "full", list(range(len(vulns))), "REVIEW_POLICY=full"
+    if report.get("truncated"):
+        return "full", list(range(len(vulns))), "first pass was truncated"
+    if not vulns:
+        return "skip", [], "no findings to correct"
+    if all(str(v.get("severity", "")).lower() == "info" for v in vulns):
+        return "skip", [], "only info findings"
+    version = pragma_version(code)
+    checked = version is not None and version >= (0, 8, 0)
+    indices = [i for i, v in enumerate(vulns) if _needs_review(v, checked)]
+    if not indices:
+        return "skip", [], "no findings subject to the review rules"
+    if len(indices) == len(vulns):
+        return "full", indices, "every finding is subject to the review rules"
+    return "subset", indices, f"{len(indices)} of {len(vulns)} findings subject to the review rules"
+
+def subset_report(report, indices):
+    """The first-pass report reduced to the findings under review."""
+    vulns = items(report, "vulnerabilities")
+    return {
+        "summary": report.get("summary", ""),
+        "risk_score": report.get("risk_score", 0),
+        "vulnerabilities": [vulns[i] for i in indices],
+        "gas_optimizations": [],
+        "best_practices": [],
+    }
+
+def merge_subset(report, indices, reviewed):
+    """Recombine untouched findings with the reviewed subset. The risk score is the review's,
+    floored by the severity of the findings that were not reviewed."""
+    keep = [v for i, v in enumerate(items(report, "vulnerabilities")) if i not in set(indices)]
+    vulns = keep + items(reviewed, "vulnerabilities")
+    for i, v in enumerate(vulns, 1):
+        v["id"] = f"V-{i:03d}"
+    score = risk_score(reviewed) if "risk_score" in reviewed else risk_score(report)
+    for v in keep:
+        score = max(score, SEVERITY_SCORE.get(str(v.get("severity", "")).lower(), 0))
+    gas = items(report, "gas_optimizations")
+    titles = {g.get("title") for g in gas}
+    gas += [g for g in items(reviewed, "gas_optimizations") if g.get("title") not in titles]
+    merged = dict(report)
+    merged.update({
+        "summary": reviewed.get("summary") or report.get("summary", ""),
+        "risk_score": score,
+        "vulnerabilities": vulns,
+        "gas_optimizations": gas,
+        "best_practices": items(report, "best_practices"),
+    })
+    return merged
@@ -0,0 +1,182 @@
+"""
+Health-aware model routing.
+Tracks a rolling window of outcomes per model (success rate, p50/p95 latency, error
+class). A model that fails ROUTER_BREAKER_FAILURES times in a row has its circuit
+opened and requests go to the healthiest eligible alternative; after
+ROUTER_COOLDOWN seconds one probe request is let through to test it again.
+"""
+import os, re, time, threading
+from collections import deque
+from hedging import percentile
+
+ROUTER_ENABLED   = os.environ.get("ROUTER", "1") != "0"
+ROUTER_WINDOW    = int(os.environ.get("ROUTER_WINDOW", 50))
+BREAKER_FAILURES = int(os.environ.get("ROUTER_BREAKER_FAILURES", 3))
+BREAKER_COOLDOWN = float(os.environ.get("ROUTER_COOLDOWN", 60))
+# Models requests may be rerouted to, besides the requested model's own fallback
+ROUTER_POOL = [m for m in os.environ.get(
+    "ROUTER_POOL", "GEMINI_2_5_FLASH,GPT_4_1_2025_04_14,CLAUDE_SONNET_4_5,GEMINI_2_5_FLASH_LITE").split(",") if m]
+
+PAYMENT_RE = re.compile(r"\b402\b|payment required|\binsufficient\b", re.I)
+AUTH_RE    = re.compile(r"\b40[13]\b|unauthori[sz]ed|forbidden|private key", re.I)
+INVALID_RE = re.compile(r"\b400\b|bad request|context length|too many tokens", re.I)
+TIMEOUT_RE = re.compile(r"timeout|timed out", re.I)
+
+def _status(exc):
+    """HTTP status carried by the exception (or its response), if any."""
+    for v in (getattr(exc, "status_code", None), getattr(exc, "status", None),
+              getattr(getattr(exc, "response", None), "status_code", None)):
+        if isinstance(v, int) and not isinstance(v, bool):
+            return v
+    return None
+
+def classify(exc):
+    """Error class of an inference exception: payment, auth, invalid, timeout or error.
+    Uses the exception's status code when it has one, else word-bounded message patterns
+    (so a "4020" port or a "7f4002aa" request id is not a 402 or a 400)."""
+    status = _status(exc)
+    if status is not None:
+        if status == 402:
+            return "payment"
+        if status in (401, 403):
+            return "auth"
+        if status in (400, 413, 422):
+            return "invalid"
+        if status in (408, 504):
+            return "timeout"
+        return "error"
+    msg = str(exc)
+    if PAYMENT_RE.search(msg):
+        return "payment"
+    if isinstance(exc, TimeoutError):
+        return "timeout"
+    if AUTH_RE.search(msg):
+        return "auth"
+    if INVALID_RE.search(msg):
+        return "invalid"
+    if TIMEOUT_RE.search(msg):
+        return "timeout"
+    return "error"
+
+class _Health:
+    __slots__ = ("outcomes", "consecutive", "state", "opened_at", "probe_at", "errors", "last_error")
+
+    def __init__(self, window):
+        self.outcomes = deque(maxlen=window)  # (ok, latency_s)
+        self.consecutive = 0
+        self.state = "closed"
+        self.opened_at = None
+        self.probe_at = None
+        self.errors = {}
+        self.last_error = None
+
+class Router:
+    def __init__(self, window=ROUTER_WINDOW, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN, pool=ROUTER_POOL,
+                 resolve=None):
+        self.window = window
+        # Model name -> backend identity. Health is kept per backend, so aliases that resolve to
+        # the same model share one breaker and a reroute never lands on the backend that failed.
+        self.resolve = resolve or (lambda name: name)
+        self.failures = failures
+        self.cooldown = cooldown
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._models = {}
+        self.rerouted = 0
+
+    def _health(self, name):
+        h = self._models.get(name)
+        if h is None:
+            h = self._models[name] = _Health(self.window)
+        return h
+
+    def record(self, name, ok, latency, error_class=None):
+        name = self.resolve(name)
+        with self._lock:
+            h = self._health(name)
+            h.outcomes.append((ok, latency))
+            h.probe_at = None
+            if ok:
+                h.consecutive = 0
+                if h.state != "closed":
+                    print(f"[Router] {name} recovered, circuit closed")
+                h.state, h.opened_at = "closed", None
+                return
+            h.consecutive += 1
+            h.errors[error_class] = h.errors.get(error_class, 0) + 1
+            h.last_error = error_class
+            if h.state == "half_open" or (h.state == "closed" and h.consecutive >= self.failures):
+                print(f"[Router] {name} circuit opened ({h.consecutive} consecutive failures, last: {error_class})")
+                h.state, h.opened_at = "open", time.monotonic()
+
+    def _available(self, name, now):
+        """Closed, or open long enough that a single probe may go through."""
+        h = self._models.get(name)
+        if h is None or h.state == "closed":
+            return True
+        if now - h.opened_at < self.cooldown:
+            return False
+        # Half-open: one probe at a time; a probe that never reported is replaced after the cooldown
+        return h.probe_at is None or now - h.probe_at >= self.cooldown
+
+    def _score(self, name):
+        """Success rate first, then proven over untried, then lower p50."""
+        h = self._models.get(name)
+        if h is None or not h.outcomes:
+            return (1.0, 0, 0.0)
+        oks = [lat for ok, lat in h.outcomes if ok]
+        return (len(oks) / len(h.outcomes), 1, -(percentile(oks, 50) or 0.0))
+
+    def choose(self, requested, fallback=None, exclude=()):
+        """Model to use for a request: the requested one if its circuit allows it, else the
+        healthiest available alternative. exclude holds models that already failed this request."""
+        if not ROUTER_ENABLED:
+            return requested
+        now = time.monotonic()
+        backend = self.resolve(requested)
+        excluded = {self.resolve(m) for m in exclude}
+        candidates = {}  # backend -> first name that resolves to it
+        for m in ([fallback] if fallback else []) + self.pool:
+            candidates.setdefault(self.resolve(m), m)
+        with self._lock:
+            if backend not in excluded and self._available(backend, now):
+                choice, key = requested, backend
+            else:
+                alternatives = [k for k in candidates
+                                if k != backend and k not in excluded and self._available(k, now)]
+                if not alternatives:
+                    return requested
+                key = max(alternatives, key=self._score)
+                choice = candidates[key]
+                self.rerouted += 1
+            h = self._models.get(key)
+            if h is not None and h.state != "closed":
+                h.state, h.probe_at = "half_open", now
+            return choice
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            models = {}
+            for name, h in self._models.items():
+                oks = [lat for ok, lat in h.outcomes if ok]
+                p50, p95 = percentile(oks, 50), percentile(oks, 95)
+                models[name] = {
+                    "state": h.state,
+                    "samples": len(h.outcomes),
+                    "success_rate": round(len(oks) / len(h.outcomes), 3) if h.outcomes else None,
+                    "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                    "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                    "consecutive_failures": h.consecutive,
+                    "errors": dict(h.errors),
+                    "last_error": h.last_error,
+                    "open_for_s": round(now - h.opened_at, 1) if h.opened_at else None,
+                }
+            return {
+                "enabled": ROUTER_ENABLED,
+                "breaker_failures": self.failures,
+                "cooldown_s": self.cooldown,
+                "pool": self.pool,
+                "rerouted": self.rerouted,
+                "models": models,
+            }
@@ -0,0 +1,124 @@
+"""
+Pooled JSON-RPC access for the Base Sepolia token reads.
+Reads are sent as one JSON-RPC batch over keep-alive httpx clients. Several RPC
+URLs can be configured (BASE_RPC_URLS); the fastest healthy one is used first
+and the others act as failover. Requests run on the background event loop.
+"""
+import os, time, threading, itertools
+import httpx
+
+DEFAULT_RPC_URLS = "https://sepolia.base.org"
+RPC_TIMEOUT      = float(os.environ.get("RPC_TIMEOUT", 5))
+RPC_COOLDOWN     = float(os.environ.get("RPC_COOLDOWN", 30))
+EWMA_ALPHA       = 0.3
+
+SELECTOR_BALANCE_OF = "0x70a08231"
+SELECTOR_DECIMALS   = "0x313ce567"
+
+class RpcError(Exception):
+    pass
+
+def eth_call(to, data):
+    return ("eth_call", [{"to": to, "data": data}, "latest"])
+
+def balance_of_call(token, account):
+    return eth_call(token, SELECTOR_BALANCE_OF + account[2:].lower().rjust(64, "0"))
+
+def decimals_call(token):
+    return eth_call(token, SELECTOR_DECIMALS)
+
+def decode_uint(result):
+    return int(result, 16) if result and result != "0x" else 0
+
+class _Endpoint:
+    __slots__ = ("url", "latency", "failures", "down_until", "requests")
+
+    def __init__(self, url):
+        self.url = url
+        self.latency = None
+        self.failures = 0
+        self.down_until = 0.0
+        self.requests = 0
+
+class RpcPool:
+    def __init__(self, urls=None, timeout=RPC_TIMEOUT, cooldown=RPC_COOLDOWN):
+        urls = urls or os.environ.get("BASE_RPC_URLS", DEFAULT_RPC_URLS).split(",")
+        self.endpoints = [_Endpoint(u.strip()) for u in urls if u.strip()]
+        self.timeout = timeout
+        self.cooldown = cooldown
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._aclient = None
+        self.batches = 0
+
+    def _ranked(self):
+        """Healthy endpoints by EWMA latency (unmeasured first), cooling-down ones last."""
+        now = time.monotonic()
+        with self._lock:
+            return sorted(self.endpoints, key=lambda e: (
+                e.down_until > now, e.latency if e.latency is not None else -1.0))
+
+    def _record(self, ep, elapsed, ok):
+        with self._lock:
+            ep.requests += 1
+            if ok:
+                ep.failures = 0
+                ep.latency = elapsed if ep.latency is None else EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * ep.latency
+            else:
+                ep.failures += 1
+                ep.down_until = time.monotonic() + self.cooldown * min(ep.failures, 4)
+
+    def _payload(self, calls):
+        ids = [next(self._ids) for _ in calls]
+        return ids, [{"jsonrpc": "2.0", "id": i, "method": m, "params": p} for i, (m, p) in zip(ids, calls)]
+
+    @staticmethod
+    def _results(ids, body):
+        if isinstance(body, dict):
+            raise RpcError(body.get("error") or "Unexpected non-batch response")
+        by_id = {item.get("id"): item for item in body}
+        out = []
+        for i in ids:
+            item = by_id.get(i)
+            if item is None or "error" in item:
+                raise RpcError(item.get("error") if item else f"Missing result for id {i}")
+            out.append(item.get("result"))
+        return out
+
+    async def abatch(self, calls):
+        """Send all calls as one JSON-RPC batch, failing over across endpoints; must run on
+        the background event loop."""
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(timeout=self.timeout,
+                                              limits=httpx.Limits(max_keepalive_connections=4))
+        ids, payload = self._payload(calls)
+        last_error = None
+        for ep in self._ranked():
+            start = time.perf_counter()
+            try:
+                r = await self._aclient.post(ep.url, json=payload)
+                r.raise_for_status()
+                results = self._results(ids, r.json())
+            except Exception as e:
+                self._record(ep, 0, False)
+                last_error = e
+                print(f"[RPC] {ep.url} failed: {e}")
+                continue
+            self._record(ep, time.perf_counter() - start, True)
+            self.batches += 1
+            return results
+        raise RpcError(f"All RPC endpoints failed: {last_error}")
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "endpoints": [{
+                    "url": e.url,
+                    "latency_ms": round(e.latency * 1000, 1) if e.latency is not None else None,
+                    "failures": e.failures,
+                    "cooling_down": e.down_until > now,
+                    "requests": e.requests,
+                } for e in self.endpoints],
+            }
@@ -0,0 +1,68 @@
+"""
+Single-flight request coalescing.
+Concurrent calls with the same key share one execution: the first caller runs the
+function, callers arriving while it runs block until it finishes and receive the
+same result (or exception). Nothing is kept once the call returns; that is the
+audit cache's job.
+"""
+import os, threading
+
+SINGLE_FLIGHT = os.environ.get("SINGLE_FLIGHT", "1") != "0"
+
+class _Call:
+    __slots__ = ("done", "result", "error", "joined")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.joined = 0
+
+class SingleFlight:
+    def __init__(self, enabled=SINGLE_FLIGHT):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Run fn() once per key at a time. Returns (result, n): n is 0 for the caller that
+        ran fn and 1, 2, ... for callers that joined its flight."""
+        if not self.enabled:
+            return fn(), 0
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                n = 0
+            else:
+                call.joined += 1
+                self.coalesced += 1
+                n = call.joined
+        if n:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, n
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "in_flight": len(self._calls),
+                "waiting": sum(c.joined for c in self._calls.values()),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+            }
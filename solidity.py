@@ -0,0 +1,223 @@
+"""
+Lightweight Solidity source scanner.
+Not a compiler: just enough lexing (comments, strings, braces) to split a file
+into contracts and their members with original line numbers.
+"""
+import re, bisect
+
+CONTAINER_RE = re.compile(r"\b(abstract\s+contract|contract|library|interface)\s+(\w+)([^{;]*)\{")
+FUNC_NAME_RE = re.compile(r"\bfunction\s+(\w+)")
+MOD_NAME_RE  = re.compile(r"\bmodifier\s+(\w+)")
+NAMED_RE     = re.compile(r"\b(?:event|error|struct|enum)\s+(\w+)")
+IDENT_RE     = re.compile(r"[A-Za-z_$][\w$]*")
+PRAGMA_RE    = re.compile(r"pragma\s+solidity\s+([^;]+);")
+
+# Members that define context every chunk of a contract needs to see
+CONTEXT_KINDS = {"state", "modifier", "event", "error", "struct", "enum", "using"}
+CODE_KINDS    = {"function", "constructor", "fallback", "receive"}
+
+def _scan(src, keep_strings):
+    """Blank out comments (and optionally string contents) with spaces, keeping length and newlines."""
+    out = list(src)
+    i, n = 0, len(src)
+    while i < n:
+        c = src[i]
+        nxt = src[i + 1] if i + 1 < n else ""
+        if c == "/" and nxt == "/":
+            j = src.find("\n", i)
+            j = n if j < 0 else j
+            for k in range(i, j):
+                out[k] = " "
+            i = j
+        elif c == "/" and nxt == "*":
+            j = src.find("*/", i + 2)
+            j = n if j < 0 else j + 2
+            for k in range(i, j):
+                if out[k] != "\n":
+                    out[k] = " "
+            i = j
+        elif c in "\"'":
+            j = i + 1
+            while j < n and src[j] != c and src[j] != "\n":
+                j += 2 if src[j] == "\\" else 1
+            j = min(j + 1, n)
+            if not keep_strings:
+                for k in range(i + 1, j - 1):
+                    out[k] = " "
+            i = j
+        else:
+            i += 1
+    return "".join(out)
+
+def strip_comments(src):
+    """Source with comments replaced by spaces (same length, same line numbers)."""
+    return _scan(src, keep_strings=True)
+
+def mask(src):
+    """Source with comments and string contents blanked, for structural scanning."""
+    return _scan(src, keep_strings=False)
+
+def match_brace(masked, open_pos):
+    """Offset just past the brace matching masked[open_pos] == '{' (len if unbalanced)."""
+    depth = 0
+    for i in range(open_pos, len(masked)):
+        c = masked[i]
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(masked)
+
+def pragma_version(src):
+    """(major, minor, patch) of the lowest version allowed by the first solidity pragma, or None."""
+    m = PRAGMA_RE.search(strip_comments(src))
+    if not m:
+        return None
+    v = re.search(r"(\d+)\.(\d+)(?:\.(\d+))?", m.group(1))
+    if not v:
+        return None
+    return int(v.group(1)), int(v.group(2)), int(v.group(3) or 0)
+
+class Unit:
+    __slots__ = ("kind", "name", "contract", "start", "end", "start_line", "end_line", "text", "bases")
+
+    def __init__(self, kind, name, contract, start, end, start_line, end_line, text, bases=None):
+        self.kind = kind
+        self.name = name
+        self.contract = contract
+        self.start = start
+        self.end = end
+        self.start_line = start_line
+        self.end_line = end_line
+        self.text = text
+        self.bases = bases or []
+
+    def __repr__(self):
+        return f"Unit({self.kind} {self.contract + '.' if self.contract else ''}{self.name} L{self.start_line}-{self.end_line})"
+
+class SourceMap:
+    """Parsed view of one Solidity file."""
+
+    def __init__(self, src):
+        self.src = src
+        self.masked = mask(src)
+        self._line_starts = [0] + [m.end() for m in re.finditer("\n", src)]
+        self.contracts = []
+        self.members = []
+        self.preamble = []
+        self._parse()
+
+    def line_of(self, offset):
+        return bisect.bisect_right(self._line_starts, offset)
+
+    def _unit(self, kind, name, contract, start, end, bases=None):
+        # Trim trailing whitespace so end_line points at the last real line
+        while end > start and self.src[end - 1].isspace():
+            end -= 1
+        return Unit(kind, name, contract, start, end, self.line_of(start), self.line_of(max(start, end - 1)),
+                    self.src[start:end], bases)
+
+    def _parse(self):
+        masked = self.masked
+        pos = 0
+        while True:
+            m = CONTAINER_RE.search(masked, pos)
+            if not m:
+                self._preamble(pos, len(masked))
+                break
+            self._preamble(pos, m.start())
+            body_open = m.end() - 1
+            end = match_brace(masked, body_open)
+            name = m.group(2)
+            bases = []
+            inherit = re.search(r"\bis\b(.*)", m.group(3), re.S)
+            if inherit:
+                bases = [b.strip().split("(")[0].strip() for b in inherit.group(1).split(",") if b.strip()]
+            kind = m.group(1).split()[-1]
+            self.contracts.append(self._unit(kind, name, None, m.start(), end, bases))
+            self._members(name, body_open + 1, end - 1)
+            pos = end
+
+    def _preamble(self, start, end):
+        for a, b in self._statements(start, end):
+            first = IDENT_RE.match(self.masked[a:b].lstrip())
+            word = first.group(0) if first else "other"
+            self.preamble.append(self._unit(word if word in ("pragma", "import") else "other", word, None, a, b))
+
+    def _statements(self, start, end):
+        """Yield (start, end) for each ';'- or '{...}'-terminated statement at depth 0."""
+        masked = self.masked
+        i = start
+        while i < end:
+            while i < end and masked[i].isspace():
+                i += 1
+            if i >= end:
+                break
+            j = i
+            while j < end and masked[j] not in ";{}":
+                j += 1
+            if j >= end:
+                yield i, end
+                break
+            if masked[j] == ";":
+                yield i, j + 1
+                i = j + 1
+            elif masked[j] == "{":
+                k = min(match_brace(masked, j), end)
+                yield i, k
+                i = k
+            else:
+                i = j + 1
+
+    def _members(self, contract, start, end):
+        for a, b in self._statements(start, end):
+            head = self.masked[a:b]
+            first = IDENT_RE.match(head.lstrip())
+            word = first.group(0) if first else ""
+            if word == "function":
+                fm = FUNC_NAME_RE.search(head)
+                kind, name = "function", fm.group(1) if fm else "function"
+            elif word in ("constructor", "fallback", "receive"):
+                kind, name = word, word
+            elif word == "modifier":
+                mm = MOD_NAME_RE.search(head)
+                kind, name = "modifier", mm.group(1) if mm else "modifier"
+            elif word in ("event", "error", "struct", "enum"):
+                nm = NAMED_RE.search(head)
+                kind, name = word, nm.group(1) if nm else word
+            elif word == "using":
+                kind, name = "using", "using"
+            else:
+                decl = re.split(r"=(?!>)", head, 1)[0].rstrip(" ;")
+                idents = IDENT_RE.findall(decl)
+                kind, name = "state", idents[-1] if idents else "state"
+            self.members.append(self._unit(kind, name, contract, a, b))
+
+    def contract(self, name):
+        for c in self.contracts:
+            if c.name == name:
+                return c
+        return None
+
+    def members_of(self, contract):
+        return [u for u in self.members if u.contract == contract]
+
+    def lineage(self, contract):
+        """The contract and its in-file ancestors, most-base first."""
+        seen, order = set(), []
+
+        def visit(name):
+            if name in seen:
+                return
+            seen.add(name)
+            c = self.contract(name)
+            if c is None:
+                return
+            for b in c.bases:
+                visit(b)
+            order.append(name)
+
+        visit(contract)
+        return order
@@ -0,0 +1,75 @@
+"""
+Cold-start bookkeeping.
+Heavy SDKs (opengradient, web3) are imported lazily through LazyModule, and every
+import / init step is timed so /api/debug can report where startup time goes.
+"""
+import time, threading, importlib
+from contextlib import contextmanager
+
+PROCESS_START = time.time()
+_timings = {"import": {}, "init": {}}
+_lock = threading.RLock()
+first_request_at = None
+
+@contextmanager
+def timed(kind, name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _timings[kind][name] = round((time.perf_counter() - t0) * 1000, 1)
+
+class LazyModule:
+    """Module proxy that imports on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._mod = None
+
+    def _load(self):
+        with _lock:
+            if self._mod is None:
+                with timed("import", self._name):
+                    try:
+                        self._mod = importlib.import_module(self._name)
+                    except Exception as e:
+                        print(f"[BOOT] {self._name} import failed: {e}")
+                        raise
+        return self._mod
+
+    @property
+    def loaded(self):
+        return self._mod is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._mod or self._load(), attr)
+
+def once(fn):
+    """Memoize a zero-argument init function, timing its first (successful) run."""
+    result = []
+
+    def wrapper():
+        if result:
+            return result[0]
+        with _lock:
+            if not result:
+                with timed("init", fn.__name__.lstrip("_")):
+                    result.append(fn())
+        return result[0]
+
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+def mark_first_request():
+    global first_request_at
+    if first_request_at is None:
+        first_request_at = time.time()
+
+def report():
+    return {
+        "imports_ms": dict(_timings["import"]),
+        "init_ms": dict(_timings["init"]),
+        "uptime_s": round(time.time() - PROCESS_START, 1),
+        "first_request_after_ms": round((first_request_at - PROCESS_START) * 1000, 1) if first_request_at else None,
+    }
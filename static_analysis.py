@@ -0,0 +1,200 @@
+"""
+Local static pre-analysis.
+Mechanical checks from AUDIT_SYSTEM_PROMPT (pragma-aware overflow, CEI reentrancy,
+tx.origin auth, unprotected ownership setters) run in milliseconds before the LLM.
+Their findings are merged into the report and passed to the model as facts; trivially
+empty contracts are answered without any inference.
+"""
+import re, time
+from solidity import SourceMap, pragma_version, CODE_KINDS
+from reports import SEVERITY_SCORE, risk_score, items
+
+EXTERNAL_CALL_RE = re.compile(r"\.(call|delegatecall)\s*[({]")
+TX_ORIGIN_RE     = re.compile(r"\btx\.origin\b")
+SENDER_CHECK_RE  = re.compile(r"(require|if)\s*\([^;{]*\bmsg\.sender\b")
+# Internal guard helpers, e.g. OpenZeppelin's _checkOwner() or a custom _onlyAdmin()
+GUARD_CALL_RE    = re.compile(r"\b_(?:check|only|require)\w*\s*\(")
+AUTH_MODIFIER_RE = re.compile(r"\b(only\w*|auth\w*|requiresAuth|initializer|reinitializer)\b")
+# tx.origin compared with msg.sender is an "is an EOA" check, not authorization
+EOA_CHECK_RE     = re.compile(r"\btx\.origin\s*[!=]=\s*msg\.sender\b|\bmsg\.sender\s*[!=]=\s*tx\.origin\b")
+VISIBILITY_RE    = re.compile(r"\b(public|external)\b")
+OWNER_NAMES      = ("owner", "_owner", "admin", "_admin", "governance", "pendingOwner")
+LINE_NOTE_RE     = re.compile(r" \(line \d+\)")
+NO_CRITICAL_RE   = re.compile(r"\s*No critical vulnerabilities (?:were )?found\.?", re.I)
+WHERE_RE         = re.compile(r"\(([^()]*(?:\(\))?)\)\s*$")
+
+def _finding(title, severity, line, where, description, recommendation, cwe):
+    return {
+        "title": title,
+        "severity": severity,
+        "description": description,
+        "line_hint": f"Line {line} ({where})",
+        "recommendation": recommendation,
+        "cwe": cwe,
+        "source": "static",
+    }
+
+def _signature(unit, masked):
+    """Text of a function header up to its body."""
+    body = masked.find("{", unit.start, unit.end)
+    return masked[unit.start:body if body >= 0 else unit.end]
+
+def _body(unit, masked):
+    body = masked.find("{", unit.start, unit.end)
+    return (body, masked[body:unit.end]) if body >= 0 else (unit.end, "")
+
+def _state_write_re(names):
+    alts = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+    # name = ..., name[...] = ..., name.x -= ..., delete name[...]
+    return re.compile(rf"(?:\bdelete\s+(?:{alts})\b|\b(?:{alts})\b(?:\s*\[[^\]]*\]|\.\w+)*\s*(?:[+\-*/|&^]?=)(?!=))")
+
+def _state_arith_re(names):
+    alts = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+    target = rf"\b(?:{alts})\b(?:\s*\[[^\]]*\]|\.\w+)*"
+    # name += ..., name[k] = name[k] - ..., name++, --name
+    return re.compile(rf"{target}\s*(?:[+\-*]=|=(?!=)[^;]*?[^+\-*/\s]\s*[+\-*](?![+\-*=]))"
+                      rf"|{target}\s*(?:\+\+|--)|(?:\+\+|--)\s*{target}")
+
+def analyze(code):
+    """Run all detectors; returns {"findings", "facts", "trivial", "ms"}."""
+    t0 = time.perf_counter()
+    sm = SourceMap(code)
+    masked = sm.masked
+    findings, facts = [], []
+
+    version = pragma_version(code)
+    checked = version is not None and version >= (0, 8, 0)
+    if version is None:
+        facts.append("No `pragma solidity` directive found; compiler version is unknown.")
+    elif checked:
+        facts.append(f"pragma solidity >= {version[0]}.{version[1]}.{version[2]}: arithmetic is checked by the compiler; "
+                     "overflow/underflow and SafeMath findings do not apply.")
+    else:
+        facts.append(f"pragma solidity {version[0]}.{version[1]}.{version[2]} (< 0.8.0): arithmetic is unchecked.")
+
+    state_by_contract = {}
+    for c in sm.contracts:
+        names = set()
+        for base in sm.lineage(c.name):
+            names.update(u.name for u in sm.members_of(base) if u.kind == "state")
+        state_by_contract[c.name] = names
+
+    functions = [u for u in sm.members if u.kind in CODE_KINDS]
+    uses_safemath = "SafeMath" in masked
+
+    for fn in functions:
+        sig = _signature(fn, masked)
+        body_start, body = _body(fn, masked)
+        where = f"{fn.name}()" if fn.kind == "function" else fn.kind
+        state = state_by_contract.get(fn.contract, set())
+
+        m = TX_ORIGIN_RE.search(EOA_CHECK_RE.sub(lambda e: " " * len(e.group(0)), body))
+        if m:
+            findings.append(_finding(
+                "Authorization via tx.origin", "high", sm.line_of(body_start + m.start()), where,
+                "tx.origin is used for authorization. A malicious contract called by the owner can pass this check "
+                "and act on the owner's behalf (phishing).",
+                "Use msg.sender for authorization checks.", "CWE-477"))
+
+        call = EXTERNAL_CALL_RE.search(body)
+        if call and state and "nonReentrant" not in sig:
+            write = _state_write_re(state).search(body, call.end())
+            if write:
+                findings.append(_finding(
+                    "Reentrancy: state updated after external call", "high",
+                    sm.line_of(body_start + call.start()), where,
+                    f"An external call is made before state is updated (line {sm.line_of(body_start + write.start())}). "
+                    "The callee can re-enter this function while the old state is still in place.",
+                    "Follow Checks-Effects-Interactions: update state before the external call, or add a reentrancy guard.",
+                    "CWE-841"))
+            else:
+                facts.append(f"{where} (line {fn.start_line}): external call with no state write after it; "
+                             "Checks-Effects-Interactions is respected (reentrancy SAFE).")
+
+        if fn.kind == "function" and VISIBILITY_RE.search(sig) and not AUTH_MODIFIER_RE.search(sig) \
+                and not SENDER_CHECK_RE.search(body) and not GUARD_CALL_RE.search(body):
+            owners = [n for n in OWNER_NAMES if n in state]
+            if owners:
+                write = _state_write_re(owners).search(body)
+                if write:
+                    findings.append(_finding(
+                        "Unprotected ownership change", "critical", sm.line_of(body_start + write.start()), where,
+                        f"{where} is public/external, has no access-control modifier or msg.sender check, and writes "
+                        "the ownership variable. Anyone can take over the contract.",
+                        "Restrict the function with an onlyOwner-style modifier or a msg.sender check.", "CWE-284"))
+
+        # Only arithmetic that lands in state (balances, totals, counters) is worth a finding
+        update = _state_arith_re(state).search(body) if state and version is not None and not checked \
+            and not uses_safemath and "pure" not in sig and "view" not in sig else None
+        if update:
+            findings.append(_finding(
+                "Unchecked arithmetic (Solidity < 0.8.0)", "medium", sm.line_of(body_start + update.start()), where,
+                "This contract compiles with a pre-0.8 compiler and no SafeMath; this state update can "
+                "silently overflow or underflow.",
+                "Upgrade to Solidity >= 0.8.0 or use SafeMath.", "CWE-190"))
+
+    trivial = bool(sm.contracts) and not any(_body(fn, masked)[1].strip("{} \n\t\r") for fn in functions)
+    if trivial:
+        facts.append("No function contains executable code.")
+
+    return {
+        "findings": findings,
+        "facts": facts,
+        "trivial": trivial and not findings,
+        "ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
+
+def facts_prompt(analysis):
+    """User-message suffix carrying the pre-computed facts to the model. Line numbers are left
+    out: they refer to the original file, while the model reads compacted or chunked code."""
+    lines = [f"- {LINE_NOTE_RE.sub('', f)}" for f in analysis["facts"]]
+    for f in analysis["findings"]:
+        where = WHERE_RE.search(f["line_hint"])
+        lines.append(f"- Detected: {f['title']}{' in ' + where.group(1) if where else ''} ({f['severity']})")
+    if not lines:
+        return ""
+    return ("\n\nPre-computed static analysis hints (pattern-based; confirm each against the code, "
+            "and leave out a detected issue that does not actually apply):\n" + "\n".join(lines))
+
+# Words that identify the same issue when the model has already reported it
+_MATCH_WORDS = {
+    "CWE-477": ("tx.origin",),
+    "CWE-841": ("reentran",),
+    "CWE-284": ("owner", "access control", "unprotected"),
+    "CWE-190": ("overflow", "underflow"),
+}
+
+def merge_findings(report, analysis):
+    """Add static findings the model did not report, renumber V-xxx ids, and bring the risk
+    score and summary in line with what was added."""
+    vulns = items(report, "vulnerabilities")
+    added = []
+    for f in analysis["findings"]:
+        words = _MATCH_WORDS.get(f["cwe"], ())
+        dup = any(v.get("cwe") == f["cwe"] or any(w in f"{v.get('title', '')} {v.get('description', '')}".lower()
+                                                 for w in words) for v in vulns)
+        if not dup:
+            vulns.append(dict(f))
+            added.append(f)
+    for i, v in enumerate(vulns, 1):
+        v["id"] = f"V-{i:03d}"
+    report["vulnerabilities"] = vulns
+    if added:
+        report["risk_score"] = max([risk_score(report)] + [SEVERITY_SCORE.get(f["severity"], 0) for f in added])
+        summary = str(report.get("summary") or "")
+        if any(f["severity"] == "critical" for f in added):
+            summary = NO_CRITICAL_RE.sub("", summary)
+        report["summary"] = (summary.strip() + f" Static analysis added {len(added)} finding(s): "
+                             + ", ".join(f"{f['title']} ({f['severity']})" for f in added) + ".").strip()
+    return report
+
+def local_report(analysis):
+    """Report for a trivially safe contract, produced without inference."""
+    return {
+        "summary": "No critical vulnerabilities found. The contract contains no executable code "
+                   "(answered by local static analysis, no LLM call).",
+        "risk_score": 0,
+        "vulnerabilities": [],
+        "gas_optimizations": [],
+        "best_practices": [{"title": f, "status": "safe", "note": "static analysis"} for f in analysis["facts"]],
+    }